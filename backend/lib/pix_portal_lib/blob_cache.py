@@ -0,0 +1,103 @@
+import logging
+import os
+import shutil
+import stat
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from pix_portal_lib.utils import compute_sha256
+
+logger = logging.getLogger()
+
+
+class BlobCache:
+    """
+    Size-bounded LRU cache of file contents on disk, keyed by the content hash. Several worker processes
+    can share the same cache directory.
+
+    Blobs are copied in and out of the cache, so jobs can modify their files without corrupting the cache,
+    and the copies taken out of the cache are verified against the hash, so a damaged blob is never used.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, content_hash: str, destination: Path) -> bool:
+        """
+        Copies the cached blob to the destination path and returns True, or returns False if the blob isn't cached
+        or doesn't match the hash anymore.
+        """
+        blob_path = self._blob_path(content_hash)
+        try:
+            # the modification time is the last use time for eviction
+            os.utime(blob_path)
+            shutil.copyfile(blob_path, destination)
+        except FileNotFoundError:
+            # not cached or evicted in the meantime
+            return False
+
+        if compute_sha256(destination) != content_hash:
+            logger.warning(f"Cached blob {blob_path} doesn't match its hash, removing it")
+            blob_path.unlink(missing_ok=True)
+            destination.unlink(missing_ok=True)
+            return False
+        return True
+
+    def add(self, content_hash: str, source: Path) -> None:
+        """
+        Adds the content of the source file to the cache if its hash matches the content hash.
+        The source file stays where it is.
+        """
+        if compute_sha256(source) != content_hash:
+            logger.warning(f"Not caching {source}, its content doesn't match the hash {content_hash}")
+            return
+
+        # NOTE: the blob is put in place with a rename, so other processes never see a partially written blob
+        tmp_path = self.cache_dir / f".{content_hash}-{uuid.uuid4()}"
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            tmp_path.replace(self._blob_path(content_hash))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._evict()
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.cache_dir / content_hash
+
+    def _evict(self) -> None:
+        entries = []
+        total_size = 0
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, path))
+            total_size += stat_result.st_size
+
+        # least recently used first
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+
+def get_blob_cache() -> Optional[BlobCache]:
+    """
+    Returns the cache configured with BLOB_CACHE_DIR and BLOB_CACHE_MAX_SIZE_MB (5120 by default),
+    or None if BLOB_CACHE_DIR isn't set.
+    """
+    cache_dir = os.getenv("BLOB_CACHE_DIR")
+    if cache_dir is None:
+        return None
+    max_size_mb = int(os.getenv("BLOB_CACHE_MAX_SIZE_MB", "5120"))
+    return BlobCache(Path(cache_dir), max_size_bytes=max_size_mb * 1024 * 1024)
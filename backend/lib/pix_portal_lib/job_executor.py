@@ -0,0 +1,46 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger()
+
+
+class JobExecutor:
+    """
+    Runs CPU-bound steps of worker jobs in a pool of max_workers processes, so several jobs run in parallel,
+    and the event loop keeps serving the Kafka consumer, status updates and uploads of other jobs meanwhile.
+
+    Processes are spawned instead of forked, because forking a process with running threads can deadlock.
+    A spawned process imports the worker's main module, so the worker must only start under
+    `if __name__ == "__main__"`. Functions and their arguments are pickled, so functions must be importable,
+    e.g., module-level functions or static methods, and their logs aren't configured.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        except BrokenProcessPool:
+            # a process died abruptly, e.g., it was killed for running out of memory, and the pool can't be used
+            # anymore, so it's shut down and a new one is started for the next jobs
+            logger.error("Job executor process pool is broken, restarting it")
+            if self._pool is pool:
+                self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
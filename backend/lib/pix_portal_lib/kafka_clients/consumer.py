@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import signal
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
+
+logger = logging.getLogger()
+
+MessageHandler = Callable[[Any], Awaitable[None]]
+
+
+class KafkaConsumerRuntime:
+    """
+    Async Kafka consumer loop shared by the workers. Polling and processing are separated: the poll loop only
+    fetches messages and starts a task per message with the handler, up to max_concurrent_messages at a time.
+    While all slots are taken, the assigned partitions are paused, so the consumer keeps polling and stays
+    in the group without fetching more messages.
+
+    Offsets are committed manually once messages are processed, failed or not, and only up to the oldest message
+    that is still being processed, so a message is redelivered if the worker stops before it's done.
+
+    Messages in progress keep running when their partition is revoked in a rebalance. If the partition is assigned
+    back, these messages are fetched again from the committed offset, and they are skipped instead of being processed
+    a second time.
+
+    SIGTERM and SIGINT stop the runtime gracefully: polling stops, the messages in progress are processed,
+    their offsets are committed and the consumer leaves the group.
+    """
+
+    _poll_timeout_ms = 1000
+
+    def __init__(
+        self,
+        topic: str,
+        group_id: str,
+        bootstrap_servers: str,
+        handler: MessageHandler,
+        max_concurrent_messages: int = 1,
+    ) -> None:
+        self.topic = topic
+        # group_id should be the same for all parallel consumers that process the same topic
+        self.group_id = group_id
+        self.consumer_id = f"{group_id}-{uuid.uuid4()}"
+        self._bootstrap_servers = bootstrap_servers
+        self._handler = handler
+        self._max_concurrent_messages = max_concurrent_messages
+
+        self._consumer: Optional[AIOKafkaConsumer] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._tasks: set[asyncio.Task] = set()
+        # offsets of the messages in progress per partition, kept after the partition is revoked until they are done
+        self._in_progress: dict[TopicPartition, set[int]] = {}
+        # offset after the last fetched message and the last committed offset per assigned partition
+        self._fetched: dict[TopicPartition, int] = {}
+        self._committed: dict[TopicPartition, int] = {}
+
+    def run_forever(self) -> None:
+        """
+        Runs the consumer in a new event loop until it's stopped with a signal.
+        """
+        asyncio.run(self.run())
+
+    async def run(self) -> None:
+        # NOTE: asyncio primitives are created inside the running event loop, Python 3.9 binds them on creation
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        self._consumer = AIOKafkaConsumer(
+            client_id=self.consumer_id,
+            group_id=self.group_id,
+            bootstrap_servers=self._bootstrap_servers,
+            auto_offset_reset="earliest",
+            enable_auto_commit=False,
+        )
+        self._consumer.subscribe([self.topic], listener=_CommitOnRevoke(self))
+        await self._consumer.start()
+        logger.info(
+            f"Kafka consumer connected: "
+            f"consumer_id={self.consumer_id}, "
+            f"group_id={self.group_id}, "
+            f"topic={self.topic}, "
+            f"max_concurrent_messages={self._max_concurrent_messages}"
+        )
+
+        try:
+            await self._poll()
+        finally:
+            logger.info(f"Kafka consumer {self.consumer_id} is stopping, waiting for {len(self._tasks)} messages")
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._commit()
+            await self._consumer.stop()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+            logger.info(f"Kafka consumer {self.consumer_id} stopped")
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _poll(self) -> None:
+        while not self._stopping.is_set():
+            free_slots = self._max_concurrent_messages - len(self._tasks)
+            if free_slots > 0:
+                self._consumer.resume(*self._consumer.paused())
+            else:
+                # NOTE: partitions assigned after a rebalance aren't paused, so they are paused on every poll
+                self._consumer.pause(*self._consumer.assignment())
+
+            batches = await self._consumer.getmany(timeout_ms=self._poll_timeout_ms, max_records=max(free_slots, 1))
+            for tp, messages in batches.items():
+                for message in messages:
+                    self._start_processing(tp, message)
+
+            await self._commit()
+
+    def _start_processing(self, tp: TopicPartition, message: ConsumerRecord) -> None:
+        self._fetched[tp] = message.offset + 1
+        in_progress = self._in_progress.setdefault(tp, set())
+        if message.offset in in_progress:
+            # the partition was revoked and assigned back while the message was being processed
+            logger.info(
+                f"Kafka consumer {self.consumer_id} skipped a message that is still being processed: "
+                f"partition={message.partition}, offset={message.offset}"
+            )
+            return
+        in_progress.add(message.offset)
+        task = asyncio.create_task(self._process(tp, message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, tp: TopicPartition, message: ConsumerRecord) -> None:
+        value = message.value.decode("utf-8")
+        logger.info(
+            f"Kafka consumer {self.consumer_id} received a message from Kafka: "
+            f"partition={message.partition}, offset={message.offset}, value={value}"
+        )
+        try:
+            await self._handler(json.loads(value))
+            logger.info(f"Kafka consumer {self.consumer_id} finished processing the message: {value}")
+        except Exception as e:
+            logger.exception(f"Kafka consumer {self.consumer_id} failed to process the message: {value}, error: {e}")
+        finally:
+            # NOTE: the offset is missing if another consumer processed the message after a rebalance
+            in_progress = self._in_progress.get(tp)
+            if in_progress is not None:
+                in_progress.discard(message.offset)
+                if not in_progress and tp not in self._fetched:
+                    del self._in_progress[tp]
+
+    def _committable_offsets(self, partitions: Optional[set[TopicPartition]] = None) -> dict[TopicPartition, int]:
+        offsets = {}
+        for tp, fetched in self._fetched.items():
+            if partitions is not None and tp not in partitions:
+                continue
+            in_progress = self._in_progress.get(tp)
+            offset = min(in_progress) if in_progress else fetched
+            if self._committed.get(tp) != offset:
+                offsets[tp] = offset
+        return offsets
+
+    async def _commit(self, partitions: Optional[set[TopicPartition]] = None) -> None:
+        offsets = self._committable_offsets(partitions)
+        if not offsets:
+            return
+        try:
+            await self._consumer.commit(offsets)
+            self._committed.update(offsets)
+        except Exception as e:
+            # the offsets are committed again on the next poll, or the messages are redelivered after a rebalance
+            logger.warning(f"Kafka consumer {self.consumer_id} failed to commit offsets {offsets}: {e}")
+
+    async def _forget_partitions(self, partitions: set[TopicPartition]) -> None:
+        await self._commit(partitions)
+        for tp in partitions:
+            if not self._in_progress.get(tp):
+                self._in_progress.pop(tp, None)
+            self._fetched.pop(tp, None)
+            self._committed.pop(tp, None)
+
+    async def _resume_partitions(self, partitions: set[TopicPartition]) -> None:
+        for tp in partitions:
+            in_progress = self._in_progress.get(tp)
+            if not in_progress:
+                continue
+            # messages before the committed offset were processed by another consumer while the partition was away,
+            # so only the later ones are still tracked here
+            committed = await self._consumer.committed(tp)
+            if committed is not None:
+                in_progress.difference_update([offset for offset in in_progress if offset < committed])
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    """
+    Commits the offsets of the processed messages before partitions are reassigned to another consumer.
+    Messages still in progress are redelivered to the new owner of the partition.
+    """
+
+    def __init__(self, runtime: KafkaConsumerRuntime) -> None:
+        self._runtime = runtime
+
+    async def on_partitions_revoked(self, revoked: set[TopicPartition]) -> None:
+        await self._runtime._forget_partitions(set(revoked))
+
+    async def on_partitions_assigned(self, assigned: set[TopicPartition]) -> None:
+        await self._runtime._resume_partitions(set(assigned))
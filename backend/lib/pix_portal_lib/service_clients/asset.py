@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import uuid
 from collections import namedtuple
 from dataclasses import dataclass
@@ -11,6 +12,7 @@ from uuid import UUID
 
 import httpx
 
+from pix_portal_lib.blob_cache import get_blob_cache
 from pix_portal_lib.utils import get_env
 
 from .file import File, FileServiceClient, FileType
@@ -21,6 +23,8 @@ logger = logging.getLogger()
 
 asset_service_url = get_env("ASSET_SERVICE_URL")
 
+_download_chunk_size = 1024 * 1024
+
 
 class AssetType(str, Enum):
     EVENT_LOG = "event_log"
@@ -67,26 +71,63 @@ class AssetServiceClient(SelfAuthenticatingClient):
         self._base_url = asset_service_url
         self._http_client = httpx.AsyncClient()
         self._file_client = FileServiceClient()
+        self._blob_cache = get_blob_cache()
+        self._max_concurrent_downloads = int(os.getenv("ASSET_MAX_CONCURRENT_DOWNLOADS", "4"))
 
     async def download_asset(
         self, asset_id: str, output_dir: Path, is_internal: bool, token: Optional[str] = None
     ) -> Asset:
         """
         Download asset files to disk and returns the asset with files field filled with File objects.
+        Files found in the blob cache (BLOB_CACHE_DIR) are copied from there instead of being downloaded.
         """
-        asset = await self.get_asset(asset_id, token=token)
+        semaphore = asyncio.Semaphore(self._max_concurrent_downloads)
+        return await self._download_asset(asset_id, output_dir, is_internal, token, semaphore)
 
-        files = []
-        for file_id in asset.files_ids:
-            file = await self._file_client.get_file(file_id, token=token)
-            file_path = await self._compose_file_path(file, output_dir)
-            await self._download_file_to_disk(asset_id, file_id, file_path, is_internal, token)
-            files.append(File_(name=file.name, type=file.type, path=file_path))
+    async def download_assets(
+        self, assets_ids: list[str], output_dir: Path, is_internal: bool, token: Optional[str] = None
+    ) -> list[Asset]:
+        """
+        Same as download_asset for several assets at once. Files of all assets are downloaded concurrently,
+        at most ASSET_MAX_CONCURRENT_DOWNLOADS (4 by default) at a time. The assets are returned in the same order.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrent_downloads)
+        assets = await asyncio.gather(
+            *[self._download_asset(asset_id, output_dir, is_internal, token, semaphore) for asset_id in assets_ids]
+        )
+        return list(assets)
+
+    async def _download_asset(
+        self, asset_id: str, output_dir: Path, is_internal: bool, token: Optional[str], semaphore: asyncio.Semaphore
+    ) -> Asset:
+        asset = await self.get_asset(asset_id, token=token)
+        asset_files = await self._file_client.get_files(asset.files_ids, token=token)
 
-        asset.files = files
+        files = await asyncio.gather(
+            *[self._download_file(asset_id, file, output_dir, is_internal, token, semaphore) for file in asset_files]
+        )
+        asset.files = list(files)
 
         return asset
 
+    async def _download_file(
+        self,
+        asset_id: str,
+        file: File,
+        output_dir: Path,
+        is_internal: bool,
+        token: Optional[str],
+        semaphore: asyncio.Semaphore,
+    ) -> File_:
+        async with semaphore:
+            file_path = await self._compose_file_path(file, output_dir)
+            if self._blob_cache is None:
+                await self._download_file_to_disk(asset_id, file.id, file_path, is_internal, token)
+            elif not await asyncio.to_thread(self._blob_cache.get, file.content_hash, file_path):
+                await self._download_file_to_disk(asset_id, file.id, file_path, is_internal, token)
+                await asyncio.to_thread(self._blob_cache.add, file.content_hash, file_path)
+        return File_(name=file.name, type=file.type, path=file_path)
+
     @staticmethod
     async def _compose_file_path(file: File, output_dir: Path):
         local_disk_path = output_dir / Path(str(file.id))
@@ -109,10 +150,12 @@ class AssetServiceClient(SelfAuthenticatingClient):
         file_url = await self.get_file_location(
             asset_id=asset_id, file_id=file_id, is_internal=is_internal, token=token
         )
-        response = await self._http_client.get(file_url, headers=await self.request_headers(token))
-        response.raise_for_status()
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+        headers = await self.request_headers(token) if self._file_client.is_blob_service_url(file_url) else None
+        async with self._http_client.stream("GET", file_url, headers=headers) as response:
+            response.raise_for_status()
+            with open(file_path, "wb") as f:
+                async for chunk in response.aiter_bytes(_download_chunk_size):
+                    f.write(chunk)
 
     async def get_asset(self, asset_id: Union[str, UUID], token: Optional[str] = None) -> Asset:
         url = urljoin(self._base_url, f"{asset_id}")
@@ -121,7 +164,8 @@ class AssetServiceClient(SelfAuthenticatingClient):
         return Asset(**response.json())
 
     async def get_assets_by_ids(self, assets_ids: list[UUID], token: str) -> list[Asset]:
-        return [await self.get_asset(asset_id, token) for asset_id in assets_ids]
+        assets = await asyncio.gather(*[self.get_asset(asset_id, token) for asset_id in assets_ids])
+        return list(assets)
 
     async def get_assets_by_project_id(self, project_id: UUID, token: str) -> list[Asset]:
         response = await self._http_client.get(
@@ -168,13 +212,23 @@ class AssetServiceClient(SelfAuthenticatingClient):
         project_id: str,
         users_ids: list[uuid.UUID],
         token: Optional[str] = None,
+        compress: bool = False,
     ) -> str:
+        """
+        Uploads the files and creates an asset from them. With compress, event logs are uploaded gzipped,
+        see FileServiceClient.upload_file.
+        """
         await self._validate_files(asset_type, files)
 
         files_ids = await asyncio.gather(
             *[
                 self._file_client.upload_file(
-                    name=file.name, path=file.path, type=file.type, users_ids=users_ids, token=token
+                    name=file.name,
+                    path=file.path,
+                    type=file.type,
+                    users_ids=users_ids,
+                    token=token,
+                    compress=compress,
                 )
                 for file in files
             ]
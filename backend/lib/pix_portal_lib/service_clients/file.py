@@ -1,13 +1,15 @@
+import asyncio
+import zlib
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Union
+from typing import AsyncIterator, Optional, Union
 from urllib.parse import urljoin
 from uuid import UUID
 
 import httpx
-from pix_portal_lib.utils import get_env
+from pix_portal_lib.utils import compute_sha256, get_env
 
 from .self_authenticating_client import SelfAuthenticatingClient
 
@@ -15,6 +17,8 @@ file_service_url = get_env("FILE_SERVICE_URL")
 blobs_base_public_url = get_env("BLOBS_BASE_PUBLIC_URL")
 blobs_base_internal_url = get_env("BLOBS_BASE_INTERNAL_URL")
 
+_upload_chunk_size = 1024 * 1024
+
 
 class FileType(str, Enum):
     EVENT_LOG_CSV = "event_log_csv"
@@ -67,6 +71,23 @@ class FileServiceClient(SelfAuthenticatingClient):
 
         return File(**response.json())
 
+    async def get_files(self, files_ids: list[Union[str, UUID]], token: Optional[str] = None) -> list[File]:
+        """
+        Fetches several files in a single request. The files are returned in the same order as the ids,
+        files that don't exist are skipped.
+        """
+        if len(files_ids) == 0:
+            return []
+
+        response = await self._client.get(
+            self._base_url,
+            params={"ids": ",".join([str(file_id) for file_id in files_ids])},
+            headers=await self.request_headers(token),
+        )
+        response.raise_for_status()
+
+        return [File(**file) for file in response.json()]
+
     async def delete_file(self, file_id: UUID, token: Optional[str] = None) -> bool:
         """
         Deletes a file using the file service.
@@ -85,35 +106,107 @@ class FileServiceClient(SelfAuthenticatingClient):
         relative_url = relative_url.removeprefix("/blobs/")
         return urljoin(base, relative_url)
 
+    def is_blob_service_url(self, url: str) -> bool:
+        """
+        Tells whether the URL points to the blobs of the API server, which require authentication,
+        as opposed to presigned URLs of the blob store, which must be requested without an Authorization header.
+        """
+        return url.startswith(self._blobs_base_internal_url) or url.startswith(self._blobs_base_public_url)
+
     async def upload_file(
-        self, name: str, path: Path, type: FileType, users_ids: list[UUID], token: Optional[str] = None
+        self,
+        name: str,
+        path: Path,
+        type: FileType,
+        users_ids: list[UUID],
+        token: Optional[str] = None,
+        compress: bool = False,
     ) -> str:
         """
         Uploads a file to the file service and returns the file ID.
         If token is not provided, the service will authenticate itself as a SYSTEM user.
+
+        The content hash is sent first, and the content itself is uploaded only if the file service doesn't have it.
+
+        If compress is True, event logs (EVENT_LOG_CSV) are gzipped while being uploaded and stored as
+        EVENT_LOG_CSV_GZ. The hash of the compressed content isn't known in advance, so these uploads skip
+        the hash negotiation, but the file service still deduplicates them.
+        """
+        if compress and type == FileType.EVENT_LOG_CSV:
+            return await self.upload_file_from_stream(
+                name=f"{name}.gz",
+                chunks=_read_file_gzipped(path),
+                type=FileType.EVENT_LOG_CSV_GZ,
+                users_ids=users_ids,
+                token=token,
+            )
+
+        content_hash = await asyncio.to_thread(compute_sha256, path)
+        response = await self._client.post(
+            urljoin(self._base_url, f"by-hash/{content_hash}"),
+            params=self._upload_params(name, type, users_ids),
+            headers=await self.request_headers(token),
+        )
+        if response.status_code != 404:
+            response.raise_for_status()
+            return response.json()["id"]
+
+        return await self.upload_file_from_stream(
+            name=name, chunks=_read_file(path), type=type, users_ids=users_ids, token=token
+        )
+
+    async def upload_file_from_stream(
+        self,
+        name: str,
+        chunks: AsyncIterator[bytes],
+        type: FileType,
+        users_ids: list[UUID],
+        token: Optional[str] = None,
+    ) -> str:
+        """
+        Uploads the content produced by an async iterator and returns the file ID. The content is sent
+        with chunked transfer encoding as it's produced, so it's never held in memory as a whole.
         """
-        content = path.read_bytes()
-        t = token or await self.token
-        params = {
-            "name": name,
-            "type": type.value,
-            "users_ids": ",".join([str(user_id) for user_id in users_ids]),
-        }
         response = await self._client.post(
             self._base_url,
-            params=params,
+            params=self._upload_params(name, type, users_ids),
             headers={
-                "Authorization": f"Bearer {t}",
+                **await self.request_headers(token),
                 "Content-Type": "application/octet-stream",
             },
-            content=content,
+            content=chunks,
         )
         response.raise_for_status()
         return response.json()["id"]
 
+    @staticmethod
+    def _upload_params(name: str, type: FileType, users_ids: list[UUID]) -> dict[str, str]:
+        return {
+            "name": name,
+            "type": type.value,
+            "users_ids": ",".join([str(user_id) for user_id in users_ids]),
+        }
+
     async def is_deleted(self, file_id: UUID, token: str) -> bool:
         file = await self.get_file(file_id, token)
         return file.is_deleted()
 
     def _file_resource_url(self, file_id: Union[UUID, str]) -> str:
         return urljoin(self._base_url, f"{file_id}")
+
+
+async def _read_file(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := await asyncio.to_thread(file.read, _upload_chunk_size):
+            yield chunk
+
+
+async def _read_file_gzipped(path: Path) -> AsyncIterator[bytes]:
+    # NOTE: zlib writes the gzip header without a timestamp, so the same file is always compressed to the same
+    #   content, which lets the file service deduplicate it
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in _read_file(path):
+        compressed = await asyncio.to_thread(compressor.compress, chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
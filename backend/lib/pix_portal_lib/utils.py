@@ -1,4 +1,6 @@
+import hashlib
 import os
+from pathlib import Path
 
 from starlette.requests import Request
 
@@ -10,6 +12,14 @@ def get_env(env_var_name: str) -> str:
     return value
 
 
+def compute_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    sha256 = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
 def get_user_id(request: Request) -> str:
     user_id = _get_user_id_from_app_state(request) or _get_user_id_from_headers(request)
     return user_id
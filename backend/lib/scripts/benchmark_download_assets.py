@@ -0,0 +1,127 @@
+"""
+Compares downloading the input assets of a job one file at a time with AssetServiceClient.download_assets,
+against a mock API that answers every request after a fixed latency and serves blobs more slowly.
+
+Usage, from backend/lib after poetry install:
+
+    poetry run python scripts/benchmark_download_assets.py [--assets 3] [--files 3] [--file-size-mb 4]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("ASSET_SERVICE_URL", "http://api/assets/")
+os.environ.setdefault("FILE_SERVICE_URL", "http://api/files/")
+os.environ.setdefault("BLOBS_BASE_PUBLIC_URL", "http://api/blobs/")
+os.environ.setdefault("BLOBS_BASE_INTERNAL_URL", "http://api/blobs/")
+os.environ.setdefault("AUTH_SERVICE_URL", "http://api/auth/")
+os.environ.setdefault("SYSTEM_EMAIL_FILE", "/dev/null")
+os.environ.setdefault("SYSTEM_PASSWORD_FILE", "/dev/null")
+# the cache would serve every file after the first run
+os.environ.pop("BLOB_CACHE_DIR", None)
+
+import httpx  # noqa: E402
+
+from pix_portal_lib.service_clients.asset import AssetServiceClient  # noqa: E402
+
+
+class MockApi:
+    def __init__(self, assets: int, files: int, file_size: int, latency: float, blob_latency: float) -> None:
+        self.assets = {str(uuid.uuid4()): [str(uuid.uuid4()) for _ in range(files)] for _ in range(assets)}
+        self.blob = b"x" * file_size
+        self.latency = latency
+        self.blob_latency = blob_latency
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.strip("/").split("/")
+        if path[0] == "blobs":
+            await asyncio.sleep(self.blob_latency)
+            return httpx.Response(200, content=self.blob)
+
+        await asyncio.sleep(self.latency)
+        if path[0] == "assets" and len(path) == 2:
+            return httpx.Response(200, json=self._asset(path[1]))
+        if path[0] == "assets":
+            # /assets/{asset_id}/files/{file_id}/location
+            return httpx.Response(200, json={"location": f"http://api/blobs/{path[3]}"})
+        if path[0] == "files":
+            return httpx.Response(200, json=[self._file(id) for id in request.url.params["ids"].split(",")])
+        return httpx.Response(404)
+
+    def _asset(self, id: str) -> dict:
+        return {
+            "id": id,
+            "creation_time": "2024-01-01T00:00:00",
+            "modification_time": None,
+            "deletion_time": None,
+            "name": "asset",
+            "description": None,
+            "type": "event_log",
+            "project_id": str(uuid.uuid4()),
+            "files_ids": self.assets[id],
+            "users_ids": [],
+            "processing_requests_ids": [],
+        }
+
+    @staticmethod
+    def _file(id: str) -> dict:
+        return {
+            "id": id,
+            "url": f"/blobs/{id}",
+            "content_hash": id,
+            "type": "event_log_csv",
+            "name": "file",
+            "users_ids": [],
+            "creation_time": "2024-01-01T00:00:00",
+        }
+
+
+def create_client(api: MockApi, max_concurrent_downloads: int) -> AssetServiceClient:
+    transport = httpx.MockTransport(api.handle)
+    client = AssetServiceClient()
+    client._http_client = httpx.AsyncClient(transport=transport)
+    client._file_client._client = httpx.AsyncClient(transport=transport)
+    client._max_concurrent_downloads = max_concurrent_downloads
+    return client
+
+
+async def main(args: argparse.Namespace) -> None:
+    api = MockApi(
+        args.assets, args.files, args.file_size_mb * 1024 * 1024, args.latency_ms / 1000, args.blob_latency_ms / 1000
+    )
+    assets_ids = list(api.assets)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        client = create_client(api, max_concurrent_downloads=1)
+        start = time.perf_counter()
+        for asset_id in assets_ids:
+            await client.download_asset(asset_id, Path(output_dir), is_internal=True, token="benchmark")
+        sequential = time.perf_counter() - start
+
+        client = create_client(api, max_concurrent_downloads=args.max_concurrent_downloads)
+        start = time.perf_counter()
+        assets = await client.download_assets(assets_ids, Path(output_dir), is_internal=True, token="benchmark")
+        concurrent = time.perf_counter() - start
+
+    assert [asset.id for asset in assets] == assets_ids
+    print(
+        f"{args.assets} assets with {args.files} files of {args.file_size_mb} MiB, "
+        f"{args.latency_ms} ms per request and {args.blob_latency_ms} ms per blob"
+    )
+    print(f"one file at a time: {sequential:.2f} s")
+    print(f"download_assets with {args.max_concurrent_downloads} concurrent downloads: {concurrent:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=3)
+    parser.add_argument("--files", type=int, default=3, help="files per asset")
+    parser.add_argument("--file-size-mb", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=50, help="latency of every API request")
+    parser.add_argument("--blob-latency-ms", type=int, default=250, help="time to serve a blob")
+    parser.add_argument("--max-concurrent-downloads", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
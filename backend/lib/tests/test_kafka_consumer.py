@@ -0,0 +1,99 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Optional
+
+from aiokafka import TopicPartition
+
+from pix_portal_lib.kafka_clients.consumer import KafkaConsumerRuntime, _CommitOnRevoke
+
+tp = TopicPartition("topic", 0)
+
+
+class FakeConsumer:
+    def __init__(self) -> None:
+        self.commits: list[dict[TopicPartition, int]] = []
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.commits.append(dict(offsets))
+
+    async def committed(self, partition: TopicPartition) -> Optional[int]:
+        for offsets in reversed(self.commits):
+            if partition in offsets:
+                return offsets[partition]
+        return None
+
+
+def message(offset: int) -> SimpleNamespace:
+    return SimpleNamespace(partition=tp.partition, offset=offset, value=json.dumps({"offset": offset}).encode())
+
+
+def test_message_in_progress_is_not_processed_again_after_revoke_and_reassign():
+    async def run() -> None:
+        started: list[int] = []
+        done = {offset: asyncio.Event() for offset in (5, 6)}
+
+        async def handler(value: dict) -> None:
+            started.append(value["offset"])
+            await done[value["offset"]].wait()
+
+        runtime = KafkaConsumerRuntime("topic", "group", "localhost:9092", handler, max_concurrent_messages=2)
+        runtime._consumer = consumer = FakeConsumer()
+        listener = _CommitOnRevoke(runtime)
+
+        await listener.on_partitions_assigned({tp})
+        runtime._start_processing(tp, message(5))
+        await asyncio.sleep(0)
+
+        # a rebalance revokes the partition and assigns it back, so the message is fetched again
+        await listener.on_partitions_revoked({tp})
+        assert consumer.commits[-1] == {tp: 5}
+        await listener.on_partitions_assigned({tp})
+        runtime._start_processing(tp, message(5))
+        runtime._start_processing(tp, message(6))
+        await asyncio.sleep(0)
+        assert started == [5, 6]
+
+        # the commit doesn't move past the message that is still running
+        done[6].set()
+        await asyncio.sleep(0)
+        await runtime._commit()
+        assert consumer.commits[-1] == {tp: 5}
+
+        done[5].set()
+        await asyncio.gather(*runtime._tasks)
+        await runtime._commit()
+        assert consumer.commits[-1] == {tp: 7}
+
+    asyncio.run(run())
+
+
+def test_message_processed_elsewhere_is_forgotten_when_partition_comes_back():
+    async def run() -> None:
+        done = asyncio.Event()
+
+        async def handler(value: dict) -> None:
+            await done.wait()
+
+        runtime = KafkaConsumerRuntime("topic", "group", "localhost:9092", handler)
+        runtime._consumer = consumer = FakeConsumer()
+        listener = _CommitOnRevoke(runtime)
+
+        await listener.on_partitions_assigned({tp})
+        runtime._start_processing(tp, message(5))
+        await asyncio.sleep(0)
+        await listener.on_partitions_revoked({tp})
+
+        # another consumer processed the message and committed past it before the partition came back
+        await consumer.commit({tp: 8})
+        await listener.on_partitions_assigned({tp})
+        runtime._start_processing(tp, message(8))
+        await runtime._commit()
+        assert consumer.commits[-1] == {tp: 8}
+
+        done.set()
+        await asyncio.gather(*runtime._tasks)
+        await runtime._commit()
+        assert consumer.commits[-1] == {tp: 9}
+
+    asyncio.run(run())
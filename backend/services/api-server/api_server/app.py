@@ -1,18 +1,26 @@
+import asyncio
+import logging
 import threading
 import traceback
 from math import e
 from pathlib import Path
 from typing import Optional
 
+from aiokafka.errors import KafkaError
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from api_server.assets.controller import router as assets_router
+from api_server.files.blob_store import get_blob_store
+from api_server.files.blob_sweeper import run_blob_sweeper
 from api_server.files.blobs_controller import router as blobs_router
 from api_server.files.files_controller import router as files_router
+from api_server.files.uploads_controller import router as uploads_router
 from api_server.processing_requests.controller import router as processing_router
+from api_server.processing_requests.kafka_producer import kafka_producer_service
+from api_server.processing_requests.outbox import outbox_relay
 from api_server.projects.controller import router as projects_router
 from api_server.users.init_db import create_initial_user, create_system_user
 from api_server.users.schemas import UserCreate, UserRead
@@ -28,6 +36,8 @@ from .users.db import User
 
 load_dotenv()
 
+logger = logging.getLogger()
+
 
 def set_current_user(request: Request, current_user: Optional[User] = Depends(current_optional_user)):
     request.state.current_user = current_user
@@ -41,6 +51,8 @@ app = FastAPI(
 )
 
 
+# NOTE: uploads must be included before files, otherwise /files/{file_id} shadows /files/uploads/{upload_id}
+app.include_router(uploads_router, prefix="/files/uploads", tags=["files"])
 app.include_router(files_router, prefix="/files", tags=["files"])
 app.include_router(blobs_router, prefix="/blobs", tags=["blobs"])
 app.include_router(assets_router, prefix="/assets", tags=["assets"])
@@ -106,5 +118,25 @@ async def on_startup():
     except Exception as e:
         print(e)
 
+    # fails on startup if the blob store is misconfigured, instead of on the first request
+    get_blob_store()
+
+    # the task is kept in the app state, otherwise it could be garbage collected while running
+    app.state.blob_sweeper_task = asyncio.create_task(run_blob_sweeper())
+
+    try:
+        await kafka_producer_service.start()
+    except KafkaError as e:
+        # the producer connects again on the first message
+        logger.warning(f"Kafka is not available on startup: {e}")
+    app.state.outbox_relay_task = asyncio.create_task(outbox_relay.run())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    app.state.blob_sweeper_task.cancel()
+    app.state.outbox_relay_task.cancel()
+    await kafka_producer_service.stop()
+
 
 instrument_app(app, service_name="api_server")
@@ -1,8 +1,9 @@
 import uuid
 from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 
+from api_server.assets.model import AssetType
 from api_server.assets.repository import AssetNotFound
 from api_server.assets.service import AssetService, get_asset_service
 from api_server.projects.service import ProjectService, get_project_service
@@ -11,6 +12,7 @@ from api_server.users.users import current_user
 from api_server.utils.exceptions.http_exceptions import (
     NotEnoughPermissionsHTTP,
 )
+from api_server.utils.persistence.pagination import Page, get_page, set_next_cursor, with_default_limit
 
 from .schemas import AssetIn, AssetOut, AssetPatchIn, LocationOut
 
@@ -19,21 +21,26 @@ router = APIRouter()
 
 @router.get("/", response_model=list[AssetOut])
 async def get_assets(
+    response: Response,
     project_id: Optional[uuid.UUID] = None,
     processing_request_id: Optional[uuid.UUID] = None,
+    lazy: bool = True,  # if false, assets of a project are returned with their files
+    type: Optional[AssetType] = None,
+    page: Page = Depends(get_page),
     asset_service: AssetService = Depends(get_asset_service),
     user: User = Depends(current_user),  # raises 401 if user is not authenticated
 ):
     if project_id:
-        result = await asset_service.get_assets_by_project_id(project_id)
-        return result
-
-    if processing_request_id:
-        result = await asset_service.get_assets_by_processing_request_id(processing_request_id)
-        return result
-
-    _raise_for_not_superuser(user)
-    return await asset_service.get_assets()
+        result = await asset_service.get_assets_by_project_id(project_id, lazy=lazy, page=page, type=type)
+    elif processing_request_id:
+        result = await asset_service.get_assets_by_processing_request_id(processing_request_id, page, type)
+    else:
+        _raise_for_not_superuser(user)
+        page = with_default_limit(page)
+        result = await asset_service.get_assets(page, type)
+
+    set_next_cursor(response, result, page)
+    return result
 
 
 @router.post("/", response_model=AssetOut, status_code=201)
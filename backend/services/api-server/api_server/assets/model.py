@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import DateTime, String, Uuid
+from sqlalchemy import DateTime, ForeignKey, Index, String, Uuid
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
@@ -25,12 +25,17 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 class Asset(Base):
     __tablename__ = "asset"
+    __table_args__ = (
+        Index("ix_asset_users_ids", "users_ids", postgresql_using="gin"),
+        Index("ix_asset_files_ids", "files_ids", postgresql_using="gin"),
+        Index("ix_asset_processing_requests_ids", "processing_requests_ids", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
 
     # Timestamps
 
-    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     modification_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     deletion_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
@@ -43,9 +48,20 @@ class Asset(Base):
     # Implicit relationships to other microservices' tables
 
     project_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False)
-    # NOTE: we don't index _ids columns because of a pretty low limit on the default btree index size.
-    #       If you still need indexing, consider this SQLAlchemy documentation page,
-    #       https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#index-types
+    # NOTE: _ids columns have GIN indexes (see __table_args__) because btree indexes have a pretty low size limit
+    #       and don't support containment. Filter these columns with .contains([id]) to use the indexes.
     users_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
     files_ids: Mapped[List[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
     processing_requests_ids: Mapped[List[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
+
+
+class AssetUser(Base):
+    """
+    User with access to the asset. The table mirrors Asset.users_ids, so access checks are a primary key lookup
+    instead of loading the whole array.
+    """
+
+    __tablename__ = "asset_user"
+
+    asset_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("asset.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, index=True)
@@ -3,10 +3,13 @@ from datetime import datetime
 from typing import AsyncGenerator, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import ColumnElement, delete, exists, func, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api_server.assets.model import Asset, AssetType
+from api_server.assets.model import Asset, AssetType, AssetUser
+from api_server.files.model import File
+from api_server.utils.persistence.pagination import Page, paginate
 from api_server.utils.persistence.sqlalchemy import get_async_session
 
 
@@ -22,22 +25,32 @@ class AssetRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_assets(self) -> Sequence[Asset]:
-        result = await self.session.execute(select(Asset))
-        return result.scalars().all()
+    async def get_assets(self, page: Optional[Page] = None, type: Optional[AssetType] = None) -> Sequence[Asset]:
+        return await self._get_assets(page=page, type=type)
 
     async def get_assets_by_ids(self, assets_ids: list[uuid.UUID]) -> Sequence[Asset]:
         result = await self.session.execute(select(Asset).where(Asset.id.in_(assets_ids)))
         return result.scalars().all()
 
-    async def get_assets_by_project_id(self, project_id: uuid.UUID) -> Sequence[Asset]:
-        result = await self.session.execute(select(Asset).where(Asset.project_id == project_id))
-        return result.scalars().all()
+    async def get_assets_by_project_id(
+        self, project_id: uuid.UUID, page: Optional[Page] = None, type: Optional[AssetType] = None
+    ) -> Sequence[Asset]:
+        return await self._get_assets(Asset.project_id == project_id, page=page, type=type)
 
-    async def get_assets_by_processing_request_id(self, processing_request_id: uuid.UUID) -> Sequence[Asset]:
-        result = await self.session.execute(
-            select(Asset).where(Asset.processing_requests_ids.contains(processing_request_id))
+    async def get_assets_by_processing_request_id(
+        self, processing_request_id: uuid.UUID, page: Optional[Page] = None, type: Optional[AssetType] = None
+    ) -> Sequence[Asset]:
+        return await self._get_assets(
+            Asset.processing_requests_ids.contains([processing_request_id]), page=page, type=type
         )
+
+    async def _get_assets(
+        self, *criteria: ColumnElement[bool], page: Optional[Page], type: Optional[AssetType]
+    ) -> Sequence[Asset]:
+        statement = select(Asset).where(*criteria)
+        if type is not None:
+            statement = statement.where(Asset.type == type)
+        result = await self.session.execute(paginate(statement, Asset, page))
         return result.scalars().all()
 
     async def get_assets_by_file_id(self, file_id: uuid.UUID) -> Sequence[Asset]:
@@ -64,16 +77,61 @@ class AssetRepository:
             description=description,
         )
         self.session.add(asset)
+        await self.session.flush()
+        await self._set_users(asset.id, users_ids)
         await self.session.commit()
         return asset
 
     async def get_asset(self, asset_id: uuid.UUID) -> Asset:
-        result = await self.session.execute(select(Asset).where(Asset.id == asset_id))
-        asset = result.scalar()
+        asset = await self.session.get(Asset, asset_id)
         if asset is None:
             raise AssetNotFound()
         return asset
 
+    async def get_asset_with_files(self, asset_id: uuid.UUID) -> tuple[Asset, list[File]]:
+        assets = await self._get_assets_with_files(Asset.id == asset_id)
+        if len(assets) == 0:
+            raise AssetNotFound()
+        return assets[0]
+
+    async def get_assets_with_files_by_project_id(
+        self, project_id: uuid.UUID, page: Optional[Page] = None, type: Optional[AssetType] = None
+    ) -> list[tuple[Asset, list[File]]]:
+        statement = select(Asset.id).where(Asset.project_id == project_id)
+        if type is not None:
+            statement = statement.where(Asset.type == type)
+        # the page limits the number of assets, not the number of joined rows, so it's applied in a subquery
+        assets_ids = paginate(statement, Asset, page).scalar_subquery()
+        return await self._get_assets_with_files(Asset.id.in_(assets_ids))
+
+    async def _get_assets_with_files(self, *criteria: ColumnElement[bool]) -> list[tuple[Asset, list[File]]]:
+        """
+        Fetches assets together with their files in a single query. The files_ids array is unnested
+        in a lateral join, so the files keep the order of files_ids. Ids of missing files are skipped.
+        """
+        asset_files = (
+            func.unnest(Asset.files_ids)
+            .table_valued("file_id", with_ordinality="position")
+            .render_derived(name="asset_files")
+            .lateral()
+        )
+        result = await self.session.execute(
+            select(Asset, File)
+            .select_from(Asset)
+            .outerjoin(asset_files, true())
+            .outerjoin(File, File.id == asset_files.c.file_id)
+            .where(*criteria)
+            .order_by(Asset.creation_time, Asset.id, asset_files.c.position)
+        )
+
+        # rows of the same asset are consecutive, and the session returns the same Asset object for each of them
+        assets: dict[uuid.UUID, tuple[Asset, list[File]]] = {}
+        for asset, file in result.tuples():
+            _, files = assets.setdefault(asset.id, (asset, []))
+            if file is not None:
+                files.append(file)
+        return list(assets.values())
+
     async def update_asset(
         self,
         asset_id: uuid.UUID,
@@ -94,6 +152,7 @@ class AssetRepository:
             asset.type = type
         if users_ids is not None:
             asset.users_ids = users_ids
+            await self._set_users(asset_id, users_ids)
         if files_ids is not None:
             asset.files_ids = files_ids
         if project_id is not None:
@@ -104,6 +163,24 @@ class AssetRepository:
         await self.session.commit()
         return asset
 
+    async def has_user(self, asset_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        result = await self.session.execute(
+            select(exists().where(AssetUser.asset_id == asset_id, AssetUser.user_id == user_id))
+        )
+        return result.scalar()
+
+    async def _set_users(self, asset_id: uuid.UUID, users_ids: list[uuid.UUID]) -> None:
+        await self.session.execute(
+            delete(AssetUser).where(AssetUser.asset_id == asset_id, AssetUser.user_id.not_in(users_ids))
+        )
+        if len(users_ids) == 0:
+            return
+        await self.session.execute(
+            insert(AssetUser)
+            .values([{"asset_id": asset_id, "user_id": user_id} for user_id in users_ids])
+            .on_conflict_do_nothing()
+        )
+
     async def delete_asset(self, asset_id: uuid.UUID) -> None:
         await self.session.execute(update(Asset).where(Asset.id == asset_id).values(deletion_time=datetime.utcnow()))
         await self.session.commit()
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 import uuid
-from typing import AsyncGenerator, Optional, Sequence
+from typing import AsyncGenerator, Optional, Sequence, Union
 
 from fastapi import Depends
 
@@ -10,6 +9,7 @@ from api_server.assets.repository import AssetRepository, get_asset_repository
 from api_server.assets.schemas import AssetOut
 from api_server.files.model import File
 from api_server.files.service import FileService, get_file_service
+from api_server.utils.persistence.pagination import Page
 
 logger = logging.getLogger()
 
@@ -23,17 +23,28 @@ class AssetService:
         self.asset_repository = asset_repository
         self.file_service = file_service
 
-    async def get_assets(self) -> Sequence[Asset]:
-        return await self.asset_repository.get_assets()
+    async def get_assets(self, page: Optional[Page] = None, type: Optional[AssetType] = None) -> Sequence[Asset]:
+        return await self.asset_repository.get_assets(page, type)
 
     async def get_assets_by_ids(self, assets_ids: list[uuid.UUID]) -> Sequence[Asset]:
         return await self.asset_repository.get_assets_by_ids(assets_ids)
 
-    async def get_assets_by_project_id(self, project_id: uuid.UUID) -> Sequence[Asset]:
-        return await self.asset_repository.get_assets_by_project_id(project_id)
+    async def get_assets_by_project_id(
+        self,
+        project_id: uuid.UUID,
+        lazy: bool = True,
+        page: Optional[Page] = None,
+        type: Optional[AssetType] = None,
+    ) -> Union[Sequence[Asset], list[AssetOut]]:
+        if lazy:
+            return await self.asset_repository.get_assets_by_project_id(project_id, page, type)
+        assets = await self.asset_repository.get_assets_with_files_by_project_id(project_id, page, type)
+        return [self._asset_out(asset, files) for asset, files in assets]
 
-    async def get_assets_by_processing_request_id(self, processing_request_id: uuid.UUID) -> Sequence[Asset]:
-        return await self.asset_repository.get_assets_by_processing_request_id(processing_request_id)
+    async def get_assets_by_processing_request_id(
+        self, processing_request_id: uuid.UUID, page: Optional[Page] = None, type: Optional[AssetType] = None
+    ) -> Sequence[Asset]:
+        return await self.asset_repository.get_assets_by_processing_request_id(processing_request_id, page, type)
 
     async def create_asset(
         self,
@@ -63,11 +74,11 @@ class AssetService:
         return asset
 
     async def get_asset(self, asset_id: uuid.UUID, lazy: bool = True) -> AssetOut:
-        asset = await self.asset_repository.get_asset(asset_id)
         if lazy:
+            asset = await self.asset_repository.get_asset(asset_id)
             return AssetOut(**asset.__dict__)
-        result = await self._post_process([asset])
-        return result[0]
+        asset, files = await self.asset_repository.get_asset_with_files(asset_id)
+        return self._asset_out(asset, files)
 
     async def update_asset(
         self,
@@ -94,20 +105,17 @@ class AssetService:
     async def delete_asset(self, asset_id: uuid.UUID) -> Asset:
         asset = await self.get_asset(asset_id)
         await self.asset_repository.delete_asset(asset_id)
-        for file_id in asset.files_ids:
-            try:
-                await self.file_service.delete_file(file_id)
-            except Exception as e:
-                logger.error(f"Failed to delete file {file_id}: {e}")
+        try:
+            await self.file_service.delete_files(asset.files_ids)
+        except Exception as e:
+            logger.error(f"Failed to delete files {asset.files_ids}: {e}")
         return asset
 
     async def delete_assets_by_project_id(self, project_id: uuid.UUID) -> None:
         assets = await self.get_assets_by_project_id(project_id)
         asset_ids = [asset.id for asset in assets]
         await self.asset_repository.delete_assets(asset_ids)
-        for asset in assets:
-            for file_id in asset.files_ids:
-                await self.file_service.delete_file(file_id)
+        await self.file_service.delete_files([file_id for asset in assets for file_id in asset.files_ids])
 
     async def does_asset_exist(self, asset_id: uuid.UUID) -> bool:
         asset = await self.asset_repository.get_asset(asset_id)
@@ -125,30 +133,22 @@ class AssetService:
     async def _fetch_files(self, files_ids: Optional[list[uuid.UUID]]) -> list[File]:
         if not files_ids or len(files_ids) == 0:
             return []
-        files = await asyncio.gather(*[self.file_service.get_file(file_id) for file_id in files_ids])
-        return list(files)
+        return await self.file_service.get_files_by_ids(files_ids)
 
     async def get_file(self, file_id: uuid.UUID) -> File:
         return await self.file_service.get_file(file_id)
 
     async def get_file_location(self, file_id: uuid.UUID, is_internal: bool) -> str:
-        file = await self.file_service.get_file(file_id)
-        relative_url = file.url
-        absolute_url = self.file_service.get_absolute_url(relative_url, is_internal)
-        return absolute_url
+        return await self.file_service.get_file_location(file_id, is_internal)
 
     async def user_has_access_to_asset(self, user_id: uuid.UUID, asset_id: uuid.UUID) -> bool:
-        asset = await self.get_asset(asset_id)
-        user_id = str(user_id)
-        users_ids = [str(user_id) for user_id in asset.users_ids]
-        return user_id in users_ids
-
-    async def _post_process(self, assets: Sequence[Asset]) -> Sequence[AssetOut]:
-        # convert to AssetOut and fetch files
-        assets_ = [AssetOut(**asset.__dict__) for asset in assets]
-        for asset in assets_:
-            asset.files = await self._fetch_files(asset.files_ids)
-        return assets_
+        return await self.asset_repository.has_user(asset_id, user_id)
+
+    @staticmethod
+    def _asset_out(asset: Asset, files: list[File]) -> AssetOut:
+        asset_ = AssetOut(**asset.__dict__)
+        asset_.files = files
+        return asset_
 
 
 async def get_asset_service(
@@ -0,0 +1,201 @@
+import os
+import re
+import uuid
+from mimetypes import guess_type
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from api_server.files.codecs import BlobCodec
+from api_server.files.service import FileService
+
+# Blobs are content-addressed, so the content behind a URL never changes and clients may cache it forever.
+# The cache is private because blobs are served only to authenticated users.
+_cache_control = "private, max-age=31536000, immutable"
+
+# Requests with more ranges than this are answered with the whole content, which RFC 9110 allows.
+_max_ranges = 32
+
+_range_pattern = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+async def serve_blob(request: Request, file_service: FileService, content_hash: str) -> Response:
+    """
+    Serves a blob from the local file system, or redirects to a presigned URL if the blob store keeps blobs
+    elsewhere. Raises FileNotFoundError if the blob is missing.
+    """
+    key, codec = await file_service.find_blob(content_hash)
+    path = file_service.blob_store.local_path(key)
+    if path is None:
+        return RedirectResponse(await file_service.blob_store.presigned_url(key, is_internal=False), status_code=307)
+    return blob_response(request, path, content_hash, codec)
+
+
+def blob_response(request: Request, path: Path, content_hash: str, codec: Optional[BlobCodec] = None) -> Response:
+    """
+    Serves a blob with support for conditional (If-None-Match, If-Range) and range requests,
+    including multiple ranges. The content hash is used as a strong ETag.
+
+    A compressed blob is sent as is with Content-Encoding if the client accepts the encoding, and decompressed
+    on the fly otherwise. Ranges of the decompressed content aren't supported, so the whole content is sent then.
+    Raises FileNotFoundError if the blob is missing on disk.
+    """
+    stat_result = os.stat(path)
+    # compressed blobs have a codec suffix, which must not be mistaken for the type of the content
+    media_type = guess_type(path.stem if codec is not None else path.name)[0] or "text/plain"
+    etag = f'"{content_hash}"'
+    headers = {"etag": etag, "cache-control": _cache_control, "accept-ranges": "bytes"}
+
+    if codec is not None:
+        headers["vary"] = "Accept-Encoding"
+        if _accepts_encoding(request.headers.get("accept-encoding", ""), codec.name):
+            # the encoded content is a different representation, so it needs its own strong ETag
+            etag = f'"{content_hash}-{codec.name}"'
+            headers["etag"] = etag
+            headers["content-encoding"] = codec.name
+        else:
+            headers["accept-ranges"] = "none"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if headers["accept-ranges"] == "none":
+        return StreamingResponse(_decompressed_chunks(codec, path), headers=headers, media_type=media_type)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (if_range is None or if_range.strip() == etag):
+        ranges = _parse_ranges(range_header, stat_result.st_size)
+        if ranges == []:
+            headers["content-range"] = f"bytes */{stat_result.st_size}"
+            return Response(status_code=416, headers=headers)
+        if ranges is not None:
+            return _FileRangesResponse(path, ranges, stat_result.st_size, media_type, headers)
+
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
+
+
+def _accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != encoding:
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return quality == "" or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+async def _decompressed_chunks(codec: BlobCodec, path: Path, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    file = await anyio.to_thread.run_sync(codec.open_decompressed, path)
+    try:
+        while chunk := await anyio.to_thread.run_sync(file.read, chunk_size):
+            yield chunk
+    finally:
+        await anyio.to_thread.run_sync(file.close)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison is used for If-None-Match, so W/ prefixes are ignored
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _parse_ranges(range_header: str, size: int) -> Optional[list[tuple[int, int]]]:
+    """
+    Parses a Range header into a list of inclusive (start, end) byte positions.
+    Returns None if the header must be ignored, and an empty list if no range is satisfiable.
+    """
+    unit, _, ranges_spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges_spec:
+        return None
+
+    specs = ranges_spec.split(",")
+    if len(specs) > _max_ranges:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = _range_pattern.match(spec)
+        if match is None:
+            return None
+        first, last = match.groups()
+        if first == "" and last == "":
+            return None
+        if first == "":
+            # suffix range, e.g., "-500" for the last 500 bytes
+            suffix_length = int(last)
+            if suffix_length > 0 and size > 0:
+                ranges.append((max(size - suffix_length, 0), size - 1))
+            continue
+        start = int(first)
+        end = size - 1 if last == "" else int(last)
+        if last != "" and end < start:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+    return ranges
+
+
+class _FileRangesResponse(Response):
+    """
+    Partial content response. A single range is sent as is, multiple ranges as multipart/byteranges.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self, path: Path, ranges: list[tuple[int, int]], size: int, content_type: str, headers: dict[str, str]
+    ) -> None:
+        self.path = path
+        self.status_code = 206
+        self.background = None
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            self._parts = [(b"", start, end)]
+            self.media_type = content_type
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self._closing = b""
+        else:
+            boundary = uuid.uuid4().hex
+            self._parts = []
+            for i, (start, end) in enumerate(ranges):
+                # every part except the first is preceded by the line break that ends the previous part
+                part_header = (
+                    ("\r\n" if i > 0 else "")
+                    + f"--{boundary}\r\n"
+                    + f"Content-Type: {content_type}\r\n"
+                    + f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                )
+                self._parts.append((part_header.encode(), start, end))
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            self._closing = f"\r\n--{boundary}--\r\n".encode()
+
+        content_length = sum(len(part) + end - start + 1 for part, start, end in self._parts) + len(self._closing)
+        headers["content-length"] = str(content_length)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for part_header, start, end in self._parts:
+                if part_header:
+                    await send({"type": "http.response.body", "body": part_header, "more_body": True})
+                await file.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self._closing, "more_body": False})
@@ -0,0 +1,171 @@
+import asyncio
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+try:
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:  # S3 is optional, install the "s3" extra to use it
+    boto3 = None
+
+from api_server.files.codecs import ZstdCodec
+from api_server.settings import settings
+
+
+class BlobStore(ABC):
+    """
+    Storage of blobs. Keys are blob names, i.e., the content hash followed by the codec suffix if compressed.
+    """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def put(self, key: str, source: Path, content_encoding: Optional[str] = None) -> None:
+        """
+        Stores the content of a local file under the key. The source file may be moved into the store.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """
+        Returns the path of the blob on the local file system, or None if the store keeps blobs elsewhere.
+        """
+        return None
+
+    async def presigned_url(self, key: str, is_internal: bool) -> Optional[str]:
+        """
+        Returns a URL to download the blob directly from the store without authenticating,
+        or None if the store doesn't support it and blobs have to be downloaded from the API.
+        """
+        return None
+
+
+class FileSystemBlobStore(BlobStore):
+    def __init__(self, base_dir: Path) -> None:
+        self.base_dir = base_dir
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    async def put(self, key: str, source: Path, content_encoding: Optional[str] = None) -> None:
+        # NOTE: renaming within the same file system is atomic, so readers never see a partially written blob
+        source.replace(self._path(key))
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / key
+
+
+class S3BlobStore(BlobStore):
+    """
+    Stores blobs in a bucket of an S3-compatible service, e.g., MinIO. Presigned URLs use the internal endpoint
+    for workers and the public endpoint for everyone else, because the endpoint is part of the signature.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        public_endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        presigned_url_expiration_seconds: int = 3600,
+    ) -> None:
+        if boto3 is None:
+            raise RuntimeError("S3 blob store requires the boto3 package")
+
+        self.bucket = bucket
+        self._presigned_url_expiration_seconds = presigned_url_expiration_seconds
+        client_kwargs = {
+            "region_name": region,
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+            # path-style addressing works with MinIO and other S3-compatible services without DNS setup
+            "config": Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        }
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, **client_kwargs)
+        self._public_client = (
+            boto3.client("s3", endpoint_url=public_endpoint_url, **client_kwargs)
+            if public_endpoint_url is not None
+            else self._client
+        )
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self._client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def put(self, key: str, source: Path, content_encoding: Optional[str] = None) -> None:
+        extra_args = {"ContentType": "text/plain"}
+        if content_encoding is not None:
+            extra_args["ContentEncoding"] = content_encoding
+        await asyncio.to_thread(self._client.upload_file, str(source), self.bucket, key, ExtraArgs=extra_args)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def presigned_url(self, key: str, is_internal: bool) -> Optional[str]:
+        client = self._client if is_internal else self._public_client
+        return client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self._presigned_url_expiration_seconds,
+        )
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Returns the blob store configured with BLOB_STORE. The store is created once and shared,
+    because S3 clients are expensive to create.
+
+    S3 can't be used with zstd compression: S3 serves blobs as stored through presigned URLs,
+    and HTTP clients of the workers can't decode zstd.
+    """
+    global _blob_store
+    if _blob_store is not None:
+        return _blob_store
+
+    if settings.blob_store == "filesystem":
+        _blob_store = FileSystemBlobStore(settings.base_dir)
+    elif settings.blob_store == "s3":
+        if settings.blob_codec == ZstdCodec.name:
+            raise ValueError("BLOB_CODEC=zstd can't be used with BLOB_STORE=s3, use gzip or none instead")
+        _blob_store = S3BlobStore(
+            bucket=settings.s3_bucket,
+            endpoint_url=settings.s3_endpoint_url,
+            public_endpoint_url=settings.s3_public_endpoint_url,
+            region=settings.s3_region,
+            access_key_id=_read_secret(settings.s3_access_key_id_file),
+            secret_access_key=_read_secret(settings.s3_secret_access_key_file),
+            presigned_url_expiration_seconds=settings.s3_presigned_url_expiration_seconds,
+        )
+    else:
+        raise ValueError(f"Unknown blob store: {settings.blob_store}")
+    return _blob_store
+
+
+def _read_secret(path: Optional[Path]) -> Optional[str]:
+    if path is None:
+        return None
+    return path.read_text().strip()
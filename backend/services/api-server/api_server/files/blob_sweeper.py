@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+from opentelemetry import metrics
+
+from api_server.files.repository import FileRepository
+from api_server.files.service import FileService
+from api_server.files.uploads_service import UploadService
+from api_server.settings import settings
+from api_server.utils.persistence.sqlalchemy import async_session_maker
+
+logger = logging.getLogger()
+
+meter = metrics.get_meter(__name__)
+removed_blobs_counter = meter.create_counter(
+    name="blobs_removed",
+    description="Number of blobs removed from the blob store because no file referenced them",
+    unit="1",
+)
+removed_uploads_counter = meter.create_counter(
+    name="uploads_expired",
+    description="Number of upload sessions and temporary files removed because they expired",
+    unit="1",
+)
+
+
+async def sweep_orphaned_blobs() -> int:
+    """
+    Removes all blobs that aren't referenced by any file, in batches, and returns how many were removed.
+    """
+    total = 0
+    while True:
+        async with async_session_maker() as session:
+            file_service = FileService(FileRepository(session))
+            removed = await file_service.remove_orphaned_blobs(limit=settings.blob_sweeper_batch_size)
+        removed_blobs_counter.add(removed)
+        total += removed
+        if removed < settings.blob_sweeper_batch_size:
+            return total
+
+
+async def sweep_expired_uploads() -> int:
+    """
+    Removes the expired upload sessions and temporary files, and returns how many were removed.
+    """
+    async with async_session_maker() as session:
+        upload_service = UploadService(FileService(FileRepository(session)))
+        removed = await upload_service.remove_expired_uploads()
+    removed_uploads_counter.add(removed)
+    return removed
+
+
+async def run_blob_sweeper() -> None:
+    """
+    Sweeps orphaned blobs and expired uploads periodically until cancelled. Several API server processes can run it
+    at the same time, because blobs being removed by one of them are skipped by the others.
+    """
+    while True:
+        try:
+            removed = await sweep_orphaned_blobs()
+            if removed > 0:
+                logger.info(f"Removed {removed} orphaned blobs")
+        except Exception as e:
+            logger.exception(f"Failed to sweep orphaned blobs: {e}")
+        try:
+            removed = await sweep_expired_uploads()
+            if removed > 0:
+                logger.info(f"Removed {removed} expired uploads")
+        except Exception as e:
+            logger.exception(f"Failed to sweep expired uploads: {e}")
+        await asyncio.sleep(settings.blob_sweeper_interval_seconds)
@@ -1,8 +1,8 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
+from api_server.files.blob_response import serve_blob
 from api_server.files.service import FileService, get_file_service
 from api_server.users.db import User
 from api_server.users.users import current_user
@@ -14,14 +14,20 @@ router = APIRouter()
 @router.get("/{hash}")
 async def get_file_content_by_hash(
     hash: str,
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     user: User = Depends(current_user),  # raises 401 if user is not authenticated
-) -> FileResponse:
-    file = await file_service.get_file_by_hash(hash)
-    # TODO: disable access check for the demo, for some reason even if file.users_ids has a user_id file_service returns False in some cases and True in others
-    # await _raise_no_access(file_service, user, file.id)
-    file_path = file_service.base_dir / hash
-    return FileResponse(file_path)
+) -> Response:
+    """
+    Returns the blob content. Supports Range, If-Range and If-None-Match headers, the ETag is the hash.
+    """
+    try:
+        file = await file_service.get_file_by_hash(hash)
+        # TODO: disable access check for the demo, for some reason even if file.users_ids has a user_id file_service returns False in some cases and True in others
+        # await _raise_no_access(file_service, user, file.id)
+        return await serve_blob(request, file_service, file.content_hash)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
 
 
 async def _raise_no_access(file_service: FileService, user: User, file_id: UUID) -> None:
@@ -0,0 +1,86 @@
+import gzip
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, install the "zstd" extra to use it
+    zstandard = None
+
+_chunk_size = 1024 * 1024
+
+
+class BlobCodec(ABC):
+    """
+    Compression applied to blobs at rest. The name is the HTTP content coding of the compressed blob,
+    so a compressed blob can be sent as is to clients that accept that encoding.
+    """
+
+    name: str
+    suffix: str
+
+    @abstractmethod
+    def compress_file(self, source: Path, destination: Path) -> None:
+        pass
+
+    @abstractmethod
+    def open_decompressed(self, path: Path) -> BinaryIO:
+        pass
+
+
+class GzipCodec(BlobCodec):
+    name = "gzip"
+    suffix = ".gz"
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compress_file(self, source: Path, destination: Path) -> None:
+        with source.open("rb") as input, gzip.open(destination, "wb", compresslevel=self.level) as output:
+            shutil.copyfileobj(input, output, _chunk_size)
+
+    def open_decompressed(self, path: Path) -> BinaryIO:
+        return gzip.open(path, "rb")
+
+
+class ZstdCodec(BlobCodec):
+    name = "zstd"
+    suffix = ".zst"
+
+    def __init__(self, level: int = 3) -> None:
+        if zstandard is None:
+            raise RuntimeError("zstd blob compression requires the zstandard package")
+        self.level = level
+
+    def compress_file(self, source: Path, destination: Path) -> None:
+        compressor = zstandard.ZstdCompressor(level=self.level)
+        with source.open("rb") as input, destination.open("wb") as output:
+            compressor.copy_stream(input, output, read_size=_chunk_size, write_size=_chunk_size)
+
+    def open_decompressed(self, path: Path) -> BinaryIO:
+        return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+
+
+_codecs = {
+    GzipCodec.name: GzipCodec,
+    ZstdCodec.name: ZstdCodec,
+}
+
+# suffixes of blobs that could have been written with any codec, used to find blobs on disk
+codecs_suffixes = {
+    GzipCodec.suffix: GzipCodec.name,
+    ZstdCodec.suffix: ZstdCodec.name,
+}
+
+
+def get_codec(name: Optional[str]) -> Optional[BlobCodec]:
+    """
+    Returns the codec with the given name or None for "none", i.e., blobs stored uncompressed.
+    """
+    if name is None or name == "none":
+        return None
+    if name not in _codecs:
+        raise ValueError(f"Unknown blob codec: {name}")
+    return _codecs[name]()
@@ -1,25 +1,34 @@
 import uuid
-from typing import Annotated, Any, Optional, Sequence
+from typing import Any, Optional, Sequence
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
 
+from api_server.files.blob_response import serve_blob
 from api_server.files.model import File, FileType
 from api_server.files.schemas import FileOut, LocationOut
-from api_server.files.service import FileExists, FileService, get_file_service
+from api_server.files.service import FileService, get_file_service
 from api_server.users.db import User
-from api_server.users.users import current_user, current_superuser
+from api_server.users.users import current_user
 from api_server.utils.exceptions.http_exceptions import NotEnoughPermissionsHTTP
+from api_server.utils.persistence.pagination import Page, get_page, set_next_cursor, with_default_limit
 
 router = APIRouter()
 
 
-@router.post("/", response_model=FileOut, status_code=201)
+# The request body is the raw file content. It's read as a stream, so it never has to fit in memory.
+_octet_stream_body = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+
+@router.post("/", response_model=FileOut, status_code=201, openapi_extra=_octet_stream_body)
 async def create_file(
     name: str,
     type: FileType,
-    content: Annotated[bytes, Body()],
-    response: Response,
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     user: User = Depends(current_user),  # raises 401 if user is not authenticated,
     users_ids: Optional[str] = None,  # list of users ids separated by commas
@@ -27,26 +36,72 @@ async def create_file(
     if not type.is_valid():
         raise HTTPException(status_code=400, detail="Invalid file type")
 
+    return await file_service.save_file_from_stream(
+        name=name, file_type=type, chunks=request.stream(), users_ids=_parse_users_ids(users_ids, user)
+    )
+
+
+@router.post("/by-hash/{content_hash}", response_model=FileOut, status_code=201)
+async def create_file_from_hash(
+    name: str,
+    type: FileType,
+    content_hash: str = Path(pattern="^[0-9a-f]{64}$"),  # SHA-256 of the file content
+    file_service: FileService = Depends(get_file_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated,
+    users_ids: Optional[str] = None,  # list of users ids separated by commas
+) -> Any:
+    """
+    Creates a file from content that is already stored, so clients can skip uploading it again.
+    Responds with 404 if the content is missing and has to be uploaded with POST /files/.
+
+    Knowing the hash doesn't prove possession of the content, so only superusers and users who already have
+    a file with this content can reuse it. Other users get 404 as well and have to upload the content.
+    """
+    if not type.is_valid():
+        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    if not user.is_superuser and not await file_service.user_has_access_to_content(user.id, content_hash):
+        raise HTTPException(status_code=404, detail="File content not found")
+
     try:
-        if users_ids is None or len(users_ids) == 0:
-            users_ids = [str(user.id)]
-        else:
-            users_ids = [uuid.UUID(user_id.strip()) for user_id in users_ids.split(",")]
-        result = await file_service.save_file(name=name, file_type=type, file_bytes=content, users_ids=users_ids)
-        response.status_code = 201
-    except FileExists as e:
-        result = e.file
-        response.status_code = 200
-    return result
+        return await file_service.save_file_from_hash(
+            name=name, file_type=type, hash=content_hash, users_ids=_parse_users_ids(users_ids, user)
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File content not found")
 
 
 @router.get("/", response_model=list[FileOut])
 async def get_files(
+    response: Response,
     file_service: FileService = Depends(get_file_service),
-    _=Depends(current_superuser),  # raises 401 if user is not authenticated
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated
+    ids: Optional[str] = None,  # list of files ids separated by commas
+    type: Optional[FileType] = None,
+    page: Page = Depends(get_page),
 ) -> Sequence[File]:
-    result = await file_service.get_files()
-    return result
+    """
+    Returns the files with the given ids in the same order, skipping the ones that don't exist.
+    Without ids, returns all files, which is allowed only for superusers. All files can be filtered by type
+    and creation time, and are paginated with limit (100 by default) and cursor. If there may be more files,
+    the cursor of the next page is returned in the X-Next-Cursor header. Filters and pagination can't be combined
+    with ids.
+    """
+    if ids is not None and (type is not None or page != Page()):
+        raise HTTPException(status_code=422, detail="ids can't be combined with type or pagination parameters")
+
+    if ids is None:
+        if not user.is_superuser:
+            raise NotEnoughPermissionsHTTP()
+        page = with_default_limit(page)
+        files = await file_service.get_files(page, type)
+        set_next_cursor(response, files, page)
+        return files
+
+    files = await file_service.get_files_by_ids(_parse_files_ids(ids))
+    if not user.is_superuser and not await file_service.user_has_access_to_files(user.id, [file.id for file in files]):
+        raise NotEnoughPermissionsHTTP()
+    return files
 
 
 @router.get("/{file_id}", response_model=FileOut)
@@ -96,18 +151,35 @@ async def get_file_location(
 @router.get("/{file_id}/content")
 async def get_file_content(
     file_id: uuid.UUID,
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     user: User = Depends(current_user),  # raises 401 if user is not authenticated
-) -> FileResponse:
+) -> Response:
+    """
+    Returns the file content. Supports Range, If-Range and If-None-Match headers, the ETag is the content hash.
+    """
     await _raise_no_access(file_service, user, file_id)
 
     try:
-        file_path = await file_service.get_file_path(file_id)
-        return FileResponse(file_path)
+        file = await file_service.get_file(file_id)
+        return await serve_blob(request, file_service, file.content_hash)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
 
 
+def _parse_users_ids(users_ids: Optional[str], user: User) -> list:
+    if users_ids is None or len(users_ids) == 0:
+        return [str(user.id)]
+    return [uuid.UUID(user_id.strip()) for user_id in users_ids.split(",")]
+
+
+def _parse_files_ids(files_ids: str) -> list[uuid.UUID]:
+    try:
+        return [uuid.UUID(file_id.strip()) for file_id in files_ids.split(",") if file_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid file id")
+
+
 async def _raise_no_access(file_service: FileService, user: User, file_id: uuid.UUID) -> None:
     if user.is_superuser is True:
         return
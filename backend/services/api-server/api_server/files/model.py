@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Uuid
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Uuid
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
@@ -33,12 +33,13 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 class File(Base):
     __tablename__ = "file"
+    __table_args__ = (Index("ix_file_users_ids", "users_ids", postgresql_using="gin"),)
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
 
     # Timestamps
 
-    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     deletion_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     # File information
@@ -50,10 +51,38 @@ class File(Base):
 
     # Implicit relationships to other microservices' tables
 
-    # NOTE: we don't index _ids columns because of a pretty low limit on the default btree index size.
-    #       If you still need indexing, consider this SQLAlchemy documentation page,
-    #       https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#index-types
+    # NOTE: _ids columns have GIN indexes (see __table_args__) because btree indexes have a pretty low size limit
+    #       and don't support containment. Filter these columns with .contains([id]) to use the indexes.
     users_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
 
     def is_valid(self) -> bool:
         return self.type.is_valid()
+
+
+class Blob(Base):
+    """
+    Stored content shared by files with the same content hash. The reference count is the number of
+    non-deleted files with the hash. Blobs without references are removed from the blob store by the sweeper.
+    """
+
+    __tablename__ = "blob"
+
+    hash: Mapped[str] = mapped_column(String, primary_key=True)
+    reference_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Timestamps
+
+    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    orphaned_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+
+
+class FileUser(Base):
+    """
+    User with access to the file. The table mirrors File.users_ids, so access checks are a primary key lookup
+    instead of loading the whole array.
+    """
+
+    __tablename__ = "file_user"
+
+    file_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("file.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, index=True)
@@ -1,12 +1,14 @@
 import uuid
 from datetime import datetime
-from typing import AsyncGenerator, Sequence
+from typing import AsyncGenerator, Awaitable, Callable, Optional, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import Uuid, all_, any_, bindparam, case, delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api_server.files.model import File, FileType
+from api_server.files.model import Blob, File, FileType, FileUser
+from api_server.utils.persistence.pagination import Page, paginate
 from api_server.utils.persistence.sqlalchemy import get_async_session
 
 
@@ -14,8 +16,18 @@ class FileRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_files(self) -> Sequence[File]:
-        result = await self.session.execute(select(File))
+    async def get_files(self, page: Optional[Page] = None, type: Optional[FileType] = None) -> Sequence[File]:
+        statement = select(File)
+        if type is not None:
+            statement = statement.where(File.type == type)
+        result = await self.session.execute(paginate(statement, File, page))
+        return result.scalars().all()
+
+    async def get_files_by_ids(self, files_ids: list[uuid.UUID]) -> Sequence[File]:
+        # NOTE: the ids are bound as a single array, so it's the same statement for any number of ids
+        result = await self.session.execute(
+            select(File).where(File.id == any_(bindparam("files_ids", files_ids, type_=ARRAY(Uuid))))
+        )
         return result.scalars().all()
 
     async def get_file(self, file_id: uuid.UUID) -> File:
@@ -48,25 +60,168 @@ class FileRepository:
     ) -> File:
         file = File(name=name, content_hash=content_hash, url=url, type=file_type, users_ids=users_ids)
         self.session.add(file)
+        await self.session.flush()
+        await self._add_users(file.id, users_ids)
         await self.session.commit()
         return file
 
     async def add_user_to_file(self, file_id: uuid.UUID, user_id: uuid.UUID) -> None:
-        await self.session.execute(
-            update(File).where(File.id == file_id).values(users_ids=File.users_ids.append(user_id))
+        await self.add_users_to_file_if_needed(file_id, [user_id])
+
+    async def add_users_to_file_if_needed(self, file_id: uuid.UUID, users_ids: list[uuid.UUID]) -> None:
+        """
+        Appends the users that the file doesn't have yet. It's a single statement instead of read-modify-write,
+        so concurrent updates of the same file aren't lost.
+        """
+        users_ids = list(dict.fromkeys(users_ids))
+        new_users_ids = (
+            func.unnest(bindparam("users_ids", users_ids, type_=ARRAY(Uuid)))
+            .table_valued("user_id")
+            .render_derived(name="new_users_ids")
+        )
+        missing_users_ids = (
+            select(func.array_agg(new_users_ids.c.user_id))
+            .where(all_(File.users_ids) != new_users_ids.c.user_id)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(File)
+            .where(File.id == file_id)
+            .values(users_ids=func.array_cat(File.users_ids, missing_users_ids))
+            .returning(File.id)
         )
+        if result.scalar() is None:
+            raise FileNotFoundError()
+        await self._add_users(file_id, users_ids)
         await self.session.commit()
 
-    async def add_users_to_file_if_needed(self, file_id: uuid.UUID, users_ids: list[uuid.UUID]) -> None:
-        current_users_ids = await self.session.execute(select(File.users_ids).where(File.id == file_id))
-        current_users_ids = current_users_ids.scalars().all()
-        new_users_ids = set(users_ids).union(set(current_users_ids))
-        await self.session.execute(update(File).where(File.id == file_id).values(users_ids=list(new_users_ids)))
+    async def has_user(self, file_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        result = await self.session.execute(
+            select(exists().where(FileUser.file_id == file_id, FileUser.user_id == user_id))
+        )
+        return result.scalar()
+
+    async def has_users(self, file_id: uuid.UUID, users_ids: list[uuid.UUID]) -> bool:
+        """
+        Tells whether all the users have access to the file.
+        """
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(FileUser)
+            .where(FileUser.file_id == file_id, FileUser.user_id.in_(users_ids))
+        )
+        return result.scalar() == len(set(users_ids))
+
+    async def has_user_for_files(self, files_ids: list[uuid.UUID], user_id: uuid.UUID) -> bool:
+        """
+        Tells whether the user has access to all the files.
+        """
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(FileUser)
+            .where(FileUser.file_id.in_(files_ids), FileUser.user_id == user_id)
+        )
+        return result.scalar() == len(set(files_ids))
+
+    async def has_user_for_hash(self, hash: str, user_id: uuid.UUID) -> bool:
+        """
+        Tells whether the user has access to a file with the given content hash that isn't deleted.
+        """
+        result = await self.session.execute(
+            select(
+                exists().where(
+                    FileUser.file_id == File.id,
+                    FileUser.user_id == user_id,
+                    File.content_hash == hash,
+                    File.deletion_time.is_(None),
+                )
+            )
+        )
+        return result.scalar()
+
+    async def _add_users(self, file_id: uuid.UUID, users_ids: list[uuid.UUID]) -> None:
+        if len(users_ids) == 0:
+            return
+        await self.session.execute(
+            insert(FileUser)
+            .values([{"file_id": file_id, "user_id": user_id} for user_id in users_ids])
+            .on_conflict_do_nothing()
+        )
+
+    async def delete_files(self, files_ids: list[uuid.UUID]) -> None:
+        """
+        Marks the files as deleted and releases their references to blobs in a single statement.
+        Files that are already deleted are skipped, so their blobs aren't released twice.
+        """
+        now = datetime.utcnow()
+        deleted_files = (
+            update(File)
+            .where(File.id.in_(files_ids), File.deletion_time.is_(None))
+            .values(deletion_time=now)
+            .returning(File.content_hash)
+            .cte("deleted_files")
+        )
+        released_references = (
+            select(deleted_files.c.content_hash, func.count().label("count"))
+            .group_by(deleted_files.c.content_hash)
+            .cte("released_references")
+        )
+        reference_count = Blob.reference_count - released_references.c.count
+        await self.session.execute(
+            update(Blob)
+            .where(Blob.hash == released_references.c.content_hash)
+            .values(reference_count=reference_count, orphaned_time=case((reference_count <= 0, now), else_=None))
+        )
         await self.session.commit()
 
-    async def delete_file(self, file_id: uuid.UUID) -> None:
-        await self.session.execute(update(File).where(File.id == file_id).values(deletion_time=datetime.utcnow()))
+    async def acquire_blob(self, hash: str) -> None:
+        """
+        Adds a reference to the blob, creating the blob if needed. The blob stays locked until the session is
+        committed by create_file, so the blob can be written safely meanwhile, and the sweeper can't remove it.
+        """
+        await self.session.execute(
+            insert(Blob)
+            .values(hash=hash, reference_count=1, creation_time=datetime.utcnow())
+            .on_conflict_do_update(
+                index_elements=[Blob.hash],
+                set_={"reference_count": Blob.reference_count + 1, "orphaned_time": None},
+            )
+        )
+
+    async def acquire_existing_blob(self, hash: str) -> bool:
+        """
+        Adds a reference to the blob if it exists and returns whether it does. Like acquire_blob,
+        the blob stays locked until the session is committed.
+        """
+        result = await self.session.execute(
+            update(Blob)
+            .where(Blob.hash == hash)
+            .values(reference_count=Blob.reference_count + 1, orphaned_time=None)
+            .returning(Blob.hash)
+        )
+        return result.scalar() is not None
+
+    async def delete_orphaned_blobs(self, limit: int, remove: Callable[[list[str]], Awaitable[None]]) -> int:
+        """
+        Deletes up to limit blobs without references and calls remove with their hashes before committing,
+        so the content is removed from the blob store while nobody can acquire the blobs again.
+        Blobs locked by other transactions are skipped. Returns the number of deleted blobs.
+        """
+        orphaned_blobs = (
+            select(Blob.hash)
+            .where(Blob.orphaned_time.is_not(None))
+            .order_by(Blob.orphaned_time)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(Blob).where(Blob.hash.in_(orphaned_blobs), Blob.reference_count <= 0).returning(Blob.hash)
+        )
+        hashes = list(result.scalars().all())
+        if len(hashes) > 0:
+            await remove(hashes)
         await self.session.commit()
+        return len(hashes)
 
 
 async def get_file_repository(
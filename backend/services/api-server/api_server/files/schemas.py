@@ -18,3 +18,17 @@ class FileOut(BaseModel):
 
 class LocationOut(BaseModel):
     location: str
+
+
+class UploadPartOut(BaseModel):
+    part_number: int
+    size: int
+
+
+class UploadOut(BaseModel):
+    id: uuid.UUID
+    name: str
+    type: str
+    users_ids: list[uuid.UUID]
+    parts: list[UploadPartOut]
+    creation_time: datetime
@@ -1,36 +1,98 @@
+import asyncio
 import hashlib
+import os
+import tempfile
 import uuid
 from pathlib import Path
-from typing import AsyncGenerator, Sequence
+from typing import AsyncGenerator, AsyncIterator, Optional, Sequence
 from urllib.parse import urljoin
 
 from fastapi import Depends
+from opentelemetry import metrics
 
+from api_server.files.blob_store import BlobStore, get_blob_store
+from api_server.files.codecs import BlobCodec, codecs_suffixes, get_codec
 from api_server.files.model import File, FileType
 from api_server.files.repository import FileRepository, get_file_repository
 from api_server.settings import settings
+from api_server.utils.persistence.pagination import Page
 
-
-class FileExists(Exception):
-    def __init__(self, file: File) -> None:
-        super().__init__(f"File with hash {file.content_hash} already exists: {file.id}")
-        self.file = file
+meter = metrics.get_meter(__name__)
+dedup_hits_counter = meter.create_counter(
+    name="files_dedup_hits",
+    description="Number of uploads whose content was already stored on disk",
+    unit="1",
+)
+dedup_misses_counter = meter.create_counter(
+    name="files_dedup_misses",
+    description="Number of uploads whose content had to be written to disk",
+    unit="1",
+)
 
 
 class FileService:
-    def __init__(self, file_repository: FileRepository) -> None:
+    def __init__(self, file_repository: FileRepository, blob_store: Optional[BlobStore] = None) -> None:
+        # NOTE: base_dir keeps temporary files and upload sessions, blobs themselves are kept in the blob store
         self.base_dir = settings.base_dir
         self.file_repository = file_repository
+        self.blob_store = blob_store or get_blob_store()
         self._blobs_base_public_url = settings.blobs_base_public_url.unicode_string()
         self._blobs_base_internal_url = settings.blobs_base_internal_url.unicode_string()
+        self.codec = get_codec(settings.blob_codec)
 
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
     async def save_file(self, name: str, file_type: FileType, file_bytes: bytes, users_ids: list[uuid.UUID]) -> File:
         hash = self._compute_sha256(file_bytes)
-        file_path = self.base_dir / hash
-        with file_path.open("wb") as file:
-            file.write(file_bytes)
+        tmp_path = self.create_temporary_file()
+        tmp_path.write_bytes(file_bytes)
+        return await self.save_file_from_temporary_file(
+            name=name, file_type=file_type, hash=hash, tmp_path=tmp_path, users_ids=users_ids
+        )
+
+    async def save_file_from_stream(
+        self, name: str, file_type: FileType, chunks: AsyncIterator[bytes], users_ids: list[uuid.UUID]
+    ) -> File:
+        """
+        Saves a file whose content arrives in chunks, e.g., from a request body, without keeping it in memory.
+        """
+        hash, tmp_path = await self._write_stream_to_temporary_file(chunks)
+        return await self.save_file_from_temporary_file(
+            name=name, file_type=file_type, hash=hash, tmp_path=tmp_path, users_ids=users_ids
+        )
+
+    async def save_file_from_temporary_file(
+        self, name: str, file_type: FileType, hash: str, tmp_path: Path, users_ids: list[uuid.UUID]
+    ) -> File:
+        """
+        Moves a temporary file with a known hash into the blob store and creates a file for it.
+        The temporary file must be created with create_temporary_file, so it can be renamed into the blob store.
+        """
+        try:
+            await self.file_repository.acquire_blob(hash)
+            if await self._blob_exists(hash):
+                dedup_hits_counter.add(1, {"file_type": file_type.value})
+            else:
+                dedup_misses_counter.add(1, {"file_type": file_type.value})
+                await self._store_blob(hash, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return await self._create_file(name=name, file_type=file_type, hash=hash, users_ids=users_ids)
+
+    async def save_file_from_hash(self, name: str, file_type: FileType, hash: str, users_ids: list[uuid.UUID]) -> File:
+        """
+        Creates a file from content that is already stored. Raises FileNotFoundError if the content is missing.
+        """
+        # NOTE: if the content is missing, the acquired reference is rolled back together with the session
+        if not await self.file_repository.acquire_existing_blob(hash) or not await self._blob_exists(hash):
+            raise FileNotFoundError()
+        dedup_hits_counter.add(1, {"file_type": file_type.value})
+        return await self._create_file(name=name, file_type=file_type, hash=hash, users_ids=users_ids)
+
+    async def _create_file(self, name: str, file_type: FileType, hash: str, users_ids: list[uuid.UUID]) -> File:
+        # NOTE: a new File entity is created even if the content is already stored, because files are deleted
+        #   together with their assets, and sharing one File between several assets would break the others.
+        #   Creating the file commits the reference to the blob acquired before.
         url = self._generate_url(hash)
         return await self.file_repository.create_file(
             name=name,
@@ -40,8 +102,17 @@ class FileService:
             users_ids=users_ids,
         )
 
-    async def get_files(self) -> Sequence[File]:
-        return await self.file_repository.get_files()
+    async def get_files(self, page: Optional[Page] = None, type: Optional[FileType] = None) -> Sequence[File]:
+        return await self.file_repository.get_files(page, type)
+
+    async def get_files_by_ids(self, files_ids: list[uuid.UUID]) -> list[File]:
+        """
+        Returns the files with the given ids in a single query, in the same order as the ids.
+        Ids of files that don't exist are skipped.
+        """
+        files = await self.file_repository.get_files_by_ids(files_ids)
+        files_by_id = {file.id: file for file in files}
+        return [files_by_id[file_id] for file_id in files_ids if file_id in files_by_id]
 
     async def get_file(self, file_id: uuid.UUID) -> File:
         return await self.file_repository.get_file(file_id)
@@ -50,43 +121,62 @@ class FileService:
         return await self.file_repository.get_file_by_hash(hash)
 
     async def delete_file(self, file_id: uuid.UUID) -> None:
-        await self.file_repository.delete_file(file_id)
-        # NOTE: we must not delete the file if it's still referenced by another file.
-        #   Each file on disk can have multiple references from File entities in the database (to preserve space)
-        #   because we create new files only when the hash of the file content is different.
-        try:
-            content_hash = await self.file_repository.get_file_hash(file_id)
-            other_references = await self.file_repository.get_files_by_hash(content_hash)
-            other_references = [file for file in other_references if file.id != file_id and file.deletion_time is None]
-            if len(other_references) == 0:
-                self._remove_file_from_disk(content_hash)
-        except Exception as e:
-            raise Exception(f"Failed to delete file {file_id}: {e}")
-
-    async def get_file_path(self, file_id: uuid.UUID) -> Path:
-        file = await self.get_file(file_id)
-        return self._file_path(file.content_hash)
+        await self.file_repository.get_file(file_id)
+        await self.file_repository.delete_files([file_id])
+
+    async def delete_files(self, files_ids: list[uuid.UUID]) -> None:
+        """
+        Deletes files in a single query. Blobs that are no longer referenced by any file are removed
+        from the blob store later by the sweeper, see remove_orphaned_blobs.
+        """
+        if len(files_ids) == 0:
+            return
+        await self.file_repository.delete_files(files_ids)
+
+    async def remove_orphaned_blobs(self, limit: int) -> int:
+        """
+        Removes up to limit blobs that aren't referenced by any file and returns how many were removed.
+        """
+        return await self.file_repository.delete_orphaned_blobs(limit, self._remove_blobs)
+
+    async def find_blob(self, hash: str) -> tuple[str, Optional[BlobCodec]]:
+        """
+        Returns the key of the blob in the blob store and the codec it is compressed with, None if it's uncompressed.
+        Blobs written with a different codec setting are found as well. Raises FileNotFoundError if it's missing.
+        """
+        for key in self._blob_keys(hash):
+            if await self.blob_store.exists(key):
+                return key, get_codec(codecs_suffixes.get(Path(key).suffix))
+        raise FileNotFoundError()
 
     async def get_file_url(self, file_id: uuid.UUID) -> str:
         file = await self.get_file(file_id)
         return file.url
 
-    async def get_file_location(self, file_id: uuid.UUID) -> str:
+    async def get_file_location(self, file_id: uuid.UUID, is_internal: bool = False) -> str:
+        """
+        Returns the URL to download the file content. Internal clients, i.e., workers, get a presigned URL
+        to download directly from the blob store if it supports it, so the content doesn't go through the API.
+        """
         file = await self.get_file(file_id)
-        relative_url = file.url.removeprefix("/blobs/")
-        return urljoin(self._blobs_base_public_url, relative_url)
+        if is_internal:
+            key, _ = await self.find_blob(file.content_hash)
+            presigned_url = await self.blob_store.presigned_url(key, is_internal=True)
+            if presigned_url is not None:
+                return presigned_url
+        return self.get_absolute_url(file.url, is_internal)
 
     async def user_has_access_to_file(self, user_id: uuid.UUID, file_id: uuid.UUID) -> bool:
-        file = await self.get_file(file_id)
-        user_id = str(user_id)
-        users_ids = [str(user_id) for user_id in file.users_ids]
-        return user_id in users_ids
+        return await self.file_repository.has_user(file_id, user_id)
+
+    async def user_has_access_to_files(self, user_id: uuid.UUID, files_ids: list[uuid.UUID]) -> bool:
+        return await self.file_repository.has_user_for_files(files_ids, user_id)
+
+    async def user_has_access_to_content(self, user_id: uuid.UUID, hash: str) -> bool:
+        return await self.file_repository.has_user_for_hash(hash, user_id)
 
     async def users_have_access_to_file(self, users_ids: list[uuid.UUID], file_id: uuid.UUID) -> bool:
-        file = await self.get_file(file_id)
-        users_ids = [str(user_id) for user_id in users_ids]
-        files_users_ids = [str(user_id) for user_id in file.users_ids]
-        return all(user_id in files_users_ids for user_id in users_ids)
+        return await self.file_repository.has_users(file_id, users_ids)
 
     async def is_deleted(self, file_id: uuid.UUID) -> bool:
         file = await self.get_file(file_id)
@@ -97,24 +187,64 @@ class FileService:
         relative_url = relative_url.removeprefix("/blobs/")
         return urljoin(base, relative_url)
 
+    def create_temporary_file(self) -> Path:
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, prefix=".upload-")
+        os.close(fd)
+        return Path(tmp_path)
+
     @staticmethod
     def _compute_sha256(content: bytes) -> str:
         return hashlib.sha256(content).hexdigest()
 
-    def _file_path(self, hash: str) -> Path:
-        return self.base_dir / hash
+    async def _write_stream_to_temporary_file(self, chunks: AsyncIterator[bytes]) -> tuple[str, Path]:
+        # NOTE: the content is written to a temporary file first, because the hash,
+        #   and so the blob key, is known only at the end.
+        sha256 = hashlib.sha256()
+        tmp_path = self.create_temporary_file()
+        try:
+            with tmp_path.open("wb") as file:
+                async for chunk in chunks:
+                    sha256.update(chunk)
+                    file.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return sha256.hexdigest(), tmp_path
+
+    def _blob_key(self, hash: str) -> str:
+        if self.codec is None:
+            return hash
+        return f"{hash}{self.codec.suffix}"
+
+    @staticmethod
+    def _blob_keys(hash: str) -> list[str]:
+        return [hash] + [f"{hash}{suffix}" for suffix in codecs_suffixes]
+
+    async def _store_blob(self, hash: str, tmp_path: Path) -> None:
+        if self.codec is None:
+            await self.blob_store.put(self._blob_key(hash), tmp_path)
+            return
+        compressed_path = self.create_temporary_file()
+        try:
+            await asyncio.to_thread(self.codec.compress_file, tmp_path, compressed_path)
+            await self.blob_store.put(self._blob_key(hash), compressed_path, content_encoding=self.codec.name)
+        finally:
+            compressed_path.unlink(missing_ok=True)
 
-    def _hash_exists_on_disk(self, hash: str) -> bool:
-        file_path = self._file_path(hash)
-        return file_path.exists()
+    async def _blob_exists(self, hash: str) -> bool:
+        for key in self._blob_keys(hash):
+            if await self.blob_store.exists(key):
+                return True
+        return False
 
     @staticmethod
     def _generate_url(hash: str) -> str:
         return f"/blobs/{hash}"
 
-    def _remove_file_from_disk(self, hash: str) -> None:
-        file_path = self._file_path(hash)
-        file_path.unlink()
+    async def _remove_blobs(self, hashes: list[str]) -> None:
+        for hash in hashes:
+            for key in self._blob_keys(hash):
+                await self.blob_store.delete(key)
 
 
 async def get_file_service(
@@ -0,0 +1,118 @@
+import uuid
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+
+from api_server.files.files_controller import _octet_stream_body, _parse_users_ids
+from api_server.files.model import FileType
+from api_server.files.schemas import FileOut, UploadOut, UploadPartOut
+from api_server.files.uploads_service import (
+    UploadCompleting,
+    UploadHashMismatch,
+    UploadIncomplete,
+    UploadNotFound,
+    UploadService,
+    get_upload_service,
+)
+from api_server.users.db import User
+from api_server.users.users import current_user
+from api_server.utils.exceptions.http_exceptions import NotEnoughPermissionsHTTP
+
+router = APIRouter()
+
+
+@router.post("/", response_model=UploadOut, status_code=201)
+async def create_upload(
+    name: str,
+    type: FileType,
+    upload_service: UploadService = Depends(get_upload_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated,
+    users_ids: Optional[str] = None,  # list of users ids separated by commas
+) -> Any:
+    """
+    Starts a resumable upload. Parts are uploaded with PUT /files/uploads/{upload_id}/parts/{part_number}
+    and assembled into a file with POST /files/uploads/{upload_id}/complete.
+    """
+    if not type.is_valid():
+        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    return await upload_service.create_upload(
+        name=name, file_type=type, users_ids=_parse_users_ids(users_ids, user), owner_id=user.id
+    )
+
+
+@router.get("/{upload_id}", response_model=UploadOut)
+async def get_upload(
+    upload_id: uuid.UUID,
+    upload_service: UploadService = Depends(get_upload_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated
+) -> Any:
+    """
+    Returns the upload with the parts received so far, so an interrupted upload can be resumed.
+    """
+    try:
+        await _raise_no_access(upload_service, user, upload_id)
+        return await upload_service.get_upload(upload_id)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadCompleting:
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+
+
+@router.put("/{upload_id}/parts/{part_number}", response_model=UploadPartOut, openapi_extra=_octet_stream_body)
+async def upload_part(
+    upload_id: uuid.UUID,
+    request: Request,
+    part_number: int = Path(ge=1, le=10000),
+    upload_service: UploadService = Depends(get_upload_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated
+) -> Any:
+    try:
+        await _raise_no_access(upload_service, user, upload_id)
+        return await upload_service.save_part(upload_id, part_number, request.stream())
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadCompleting:
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+
+
+@router.post("/{upload_id}/complete", response_model=FileOut, status_code=201)
+async def complete_upload(
+    upload_id: uuid.UUID,
+    upload_service: UploadService = Depends(get_upload_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated
+    content_hash: Optional[str] = None,  # SHA-256 of the whole file content to verify the upload
+) -> Any:
+    try:
+        await _raise_no_access(upload_service, user, upload_id)
+        return await upload_service.complete_upload(upload_id, content_hash=content_hash)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadCompleting:
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+    except UploadIncomplete:
+        raise HTTPException(status_code=400, detail="Parts must be numbered consecutively starting from 1")
+    except UploadHashMismatch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{upload_id}", status_code=204)
+async def abort_upload(
+    upload_id: uuid.UUID,
+    upload_service: UploadService = Depends(get_upload_service),
+    user: User = Depends(current_user),  # raises 401 if user is not authenticated
+) -> None:
+    try:
+        await _raise_no_access(upload_service, user, upload_id)
+        await upload_service.abort_upload(upload_id)
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadCompleting:
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+
+
+async def _raise_no_access(upload_service: UploadService, user: User, upload_id: uuid.UUID) -> None:
+    if user.is_superuser is True:
+        return
+    if await upload_service.get_upload_owner_id(upload_id) != user.id:
+        raise NotEnoughPermissionsHTTP()
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+from fastapi import Depends
+
+from api_server.files.model import File, FileType
+from api_server.files.schemas import UploadOut, UploadPartOut
+from api_server.files.service import FileService, get_file_service
+from api_server.settings import settings
+
+_manifest_name = "manifest.json"
+_completing_manifest_name = "manifest.completing.json"
+_part_prefix = "part-"
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+class UploadIncomplete(Exception):
+    pass
+
+
+class UploadCompleting(Exception):
+    pass
+
+
+class UploadHashMismatch(Exception):
+    def __init__(self, expected_hash: str, actual_hash: str) -> None:
+        super().__init__(f"Expected content hash {expected_hash}, got {actual_hash}")
+        self.expected_hash = expected_hash
+        self.actual_hash = actual_hash
+
+
+class UploadService:
+    """
+    Resumable multipart uploads. An upload session is a directory on disk with a manifest and the uploaded parts.
+    Parts can be uploaded in any order and in parallel, and re-uploading a part replaces it. Completing the upload
+    assembles the parts into a blob of the file service and removes the session.
+
+    Completing an upload claims the session first by renaming its manifest, which is atomic, so only one request
+    completes it, and the session can't be changed meanwhile. Expired sessions are removed by the blob sweeper.
+    """
+
+    def __init__(self, file_service: FileService) -> None:
+        self.file_service = file_service
+        self.base_dir = file_service.base_dir / ".uploads"
+        self._expiration_seconds = settings.upload_session_expiration_hours * 3600
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    async def create_upload(
+        self, name: str, file_type: FileType, users_ids: list[uuid.UUID], owner_id: uuid.UUID
+    ) -> UploadOut:
+        upload_id = uuid.uuid4()
+        upload_dir = self._upload_dir(upload_id)
+        upload_dir.mkdir()
+        manifest = {
+            "name": name,
+            "type": file_type.value,
+            "users_ids": [str(user_id) for user_id in users_ids],
+            "owner_id": str(owner_id),
+            "creation_time": datetime.utcnow().isoformat(),
+        }
+        (upload_dir / _manifest_name).write_text(json.dumps(manifest))
+        return self._upload_out(upload_id, manifest)
+
+    async def get_upload(self, upload_id: uuid.UUID) -> UploadOut:
+        return self._upload_out(upload_id, self._read_manifest(upload_id))
+
+    async def get_upload_owner_id(self, upload_id: uuid.UUID) -> uuid.UUID:
+        return uuid.UUID(self._read_manifest(upload_id)["owner_id"])
+
+    async def save_part(self, upload_id: uuid.UUID, part_number: int, chunks: AsyncIterator[bytes]) -> UploadPartOut:
+        upload_dir = self._upload_dir(upload_id)
+        self._read_manifest(upload_id)
+
+        # NOTE: the part is written under a temporary name and renamed at the end, so an interrupted request
+        #   never leaves a truncated part behind, and concurrent retries of the same part don't interleave.
+        part_path = upload_dir / f"{_part_prefix}{part_number:05d}"
+        tmp_path = upload_dir / f".{part_path.name}-{uuid.uuid4()}"
+        size = 0
+        try:
+            with tmp_path.open("wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    file.write(chunk)
+            tmp_path.replace(part_path)
+        except FileNotFoundError:
+            # the session was completed, aborted or expired in the meantime
+            raise UploadNotFound()
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return UploadPartOut(part_number=part_number, size=size)
+
+    async def complete_upload(self, upload_id: uuid.UUID, content_hash: Optional[str] = None) -> File:
+        """
+        Assembles the uploaded parts into a file. Parts must be numbered consecutively starting from 1.
+        If content_hash is given, the SHA-256 of the assembled content must match it.
+        """
+        upload_dir = self._upload_dir(upload_id)
+        manifest = self._read_manifest(upload_id)
+        try:
+            os.rename(upload_dir / _manifest_name, upload_dir / _completing_manifest_name)
+        except FileNotFoundError:
+            # another request claimed, aborted or expired the session in the meantime
+            self._read_manifest(upload_id)
+            raise UploadCompleting()
+
+        try:
+            file = await self._assemble_file(upload_id, manifest, content_hash)
+        except BaseException:
+            # the session can be completed again, e.g., after uploading the missing parts
+            os.rename(upload_dir / _completing_manifest_name, upload_dir / _manifest_name)
+            raise
+        await asyncio.to_thread(shutil.rmtree, upload_dir, True)
+        return file
+
+    async def abort_upload(self, upload_id: uuid.UUID) -> None:
+        self._read_manifest(upload_id)
+        await asyncio.to_thread(shutil.rmtree, self._upload_dir(upload_id), True)
+
+    async def remove_expired_uploads(self) -> int:
+        """
+        Removes the upload sessions and the temporary files without any activity during the expiration period,
+        and returns how many were removed.
+        """
+        return await asyncio.to_thread(self._remove_expired_uploads)
+
+    async def _assemble_file(self, upload_id: uuid.UUID, manifest: dict, content_hash: Optional[str]) -> File:
+        parts = self._parts(upload_id)
+        if len(parts) == 0 or [part_number for part_number, _ in parts] != list(range(1, len(parts) + 1)):
+            raise UploadIncomplete()
+
+        tmp_path = self.file_service.create_temporary_file()
+        try:
+            hash = await asyncio.to_thread(self._concatenate_parts, [path for _, path in parts], tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if content_hash is not None and content_hash != hash:
+            tmp_path.unlink(missing_ok=True)
+            raise UploadHashMismatch(expected_hash=content_hash, actual_hash=hash)
+
+        return await self.file_service.save_file_from_temporary_file(
+            name=manifest["name"],
+            file_type=FileType(manifest["type"]),
+            hash=hash,
+            tmp_path=tmp_path,
+            users_ids=[uuid.UUID(user_id) for user_id in manifest["users_ids"]],
+        )
+
+    def _upload_dir(self, upload_id: uuid.UUID) -> Path:
+        return self.base_dir / str(upload_id)
+
+    def _read_manifest(self, upload_id: uuid.UUID) -> dict:
+        upload_dir = self._upload_dir(upload_id)
+        try:
+            return json.loads((upload_dir / _manifest_name).read_text())
+        except FileNotFoundError:
+            if (upload_dir / _completing_manifest_name).exists():
+                raise UploadCompleting()
+            raise UploadNotFound()
+
+    def _parts(self, upload_id: uuid.UUID) -> list[tuple[int, Path]]:
+        parts = [
+            (int(path.name.removeprefix(_part_prefix)), path)
+            for path in self._upload_dir(upload_id).glob(f"{_part_prefix}*")
+        ]
+        return sorted(parts)
+
+    def _upload_out(self, upload_id: uuid.UUID, manifest: dict) -> UploadOut:
+        parts = [
+            UploadPartOut(part_number=part_number, size=path.stat().st_size)
+            for part_number, path in self._parts(upload_id)
+        ]
+        return UploadOut(
+            id=upload_id,
+            name=manifest["name"],
+            type=manifest["type"],
+            users_ids=manifest["users_ids"],
+            parts=parts,
+            creation_time=manifest["creation_time"],
+        )
+
+    @staticmethod
+    def _concatenate_parts(parts_paths: list[Path], destination: Path) -> str:
+        sha256 = hashlib.sha256()
+        with destination.open("wb") as output:
+            for part_path in parts_paths:
+                with part_path.open("rb") as part:
+                    while chunk := part.read(1024 * 1024):
+                        sha256.update(chunk)
+                        output.write(chunk)
+        return sha256.hexdigest()
+
+    def _remove_expired_uploads(self) -> int:
+        # NOTE: the modification time of the session directory changes with every uploaded part,
+        #   so only sessions without any activity during the expiration period are removed.
+        #   Temporary files are left behind in the base directory when the server stops in the middle of a request.
+        expiration_time = time.time() - self._expiration_seconds
+        expired = list(self.base_dir.iterdir()) + list(self.file_service.base_dir.glob(".upload-*"))
+        removed = 0
+        for path in expired:
+            try:
+                if path.stat().st_mtime >= expiration_time:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+                removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+async def get_upload_service(
+    file_service: FileService = Depends(get_file_service),
+) -> AsyncGenerator[UploadService, None]:
+    yield UploadService(file_service)
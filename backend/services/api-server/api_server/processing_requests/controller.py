@@ -1,11 +1,11 @@
 import uuid
 from typing import Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from fastapi.exceptions import HTTPException
 
 from api_server.assets.service import AssetService, get_asset_service
-from api_server.processing_requests.model import ProcessingRequest
+from api_server.processing_requests.model import ProcessingRequest, ProcessingRequestStatus, ProcessingRequestType
 from api_server.processing_requests.repository import ProcessingRequestNotFound
 from api_server.processing_requests.schemas import (
     AssetIn,
@@ -13,16 +13,17 @@ from api_server.processing_requests.schemas import (
     PatchProcessingRequest,
     ProcessingRequestIn,
     ProcessingRequestOut,
+    ProcessingRequestsBatchIn,
 )
 from api_server.processing_requests.service import (
     AssetAlreadyExists,
     AssetAlreadyInOutputAssets,
     AssetDoesNotBelongToProject,
     AssetNotFound,
+    InvalidInputAssets,
     NotEnoughPermissions,
     ProcessingRequestService,
     ProjectNotFound,
-    QueueNotAvailable,
     UserNotFound,
     get_processing_request_service,
 )
@@ -39,6 +40,7 @@ from api_server.utils.exceptions.http_exceptions import (
     ProjectNotFoundHTTP,
     UserNotFoundHTTP,
 )
+from api_server.utils.persistence.pagination import Page, get_page, set_next_cursor
 
 router = APIRouter()
 
@@ -48,18 +50,24 @@ router = APIRouter()
 
 @router.get("/", response_model=list[ProcessingRequestOut], tags=["processing_requests"])
 async def get_processing_requests(
+    response: Response,
     user_id: Optional[uuid.UUID] = None,
     project_id: Optional[uuid.UUID] = None,
     asset_id: Optional[uuid.UUID] = None,
     input_asset_id: Optional[uuid.UUID] = None,
     output_asset_id: Optional[uuid.UUID] = None,
     with_output_assets: Optional[bool] = False,
+    status: Optional[ProcessingRequestStatus] = None,
+    type: Optional[ProcessingRequestType] = None,
+    page: Page = Depends(get_page),
     processing_request_service: ProcessingRequestService = Depends(get_processing_request_service),
     asset_service: AssetService = Depends(get_asset_service),
     user: User = Depends(current_user),
 ) -> Any:
     """
     Get processing requests either by user_id, project_id or asset_id. Superusers can get all processing requests.
+    Results can be filtered by status, type and creation time, and paginated with limit and cursor. If there may
+    be more results, the cursor of the next page is returned in the X-Next-Cursor header.
     """
     current_user_id = str(user.id)
     requested_user_id = str(user_id) if user_id is not None else None
@@ -67,12 +75,14 @@ async def get_processing_requests(
     # Processing requests of other users can be accessed only by superusers
     if user_id is not None and current_user_id != requested_user_id:
         _raise_for_not_superuser(user)
-        return await processing_request_service.get_processing_requests_by_user_id(user_id)
+        processing_requests = await processing_request_service.get_processing_requests_by_user_id(
+            user_id, page, status, type
+        )
 
-    if project_id is not None:
+    elif project_id is not None:
         try:
             processing_requests = await processing_request_service.get_processing_requests_by_project_id(
-                project_id, user.__dict__
+                project_id, user.__dict__, page, status, type
             )
             if with_output_assets:
                 for processing_request in processing_requests:
@@ -80,21 +90,32 @@ async def get_processing_requests(
                         processing_request.output_assets = await asset_service.get_assets_by_ids(
                             processing_request.output_assets_ids
                         )
-            return processing_requests
 
         except NotEnoughPermissions:
             raise NotEnoughPermissionsHTTP()
 
-    if asset_id is not None:
-        return await processing_request_service.get_processing_requests_by_asset_id(asset_id)
+    elif asset_id is not None:
+        processing_requests = await processing_request_service.get_processing_requests_by_asset_id(
+            asset_id, page, status, type
+        )
 
-    if input_asset_id is not None:
-        return await processing_request_service.get_processing_requests_by_input_asset_id(input_asset_id)
+    elif input_asset_id is not None:
+        processing_requests = await processing_request_service.get_processing_requests_by_input_asset_id(
+            input_asset_id, page, status, type
+        )
 
-    if output_asset_id is not None:
-        return await processing_request_service.get_processing_requests_by_output_asset_id(output_asset_id)
+    elif output_asset_id is not None:
+        processing_requests = await processing_request_service.get_processing_requests_by_output_asset_id(
+            output_asset_id, page, status, type
+        )
 
-    return await processing_request_service.get_processing_requests_by_user_id(user.id)
+    else:
+        processing_requests = await processing_request_service.get_processing_requests_by_user_id(
+            user.id, page, status, type
+        )
+
+    set_next_cursor(response, processing_requests, page)
+    return processing_requests
 
 
 @router.post("/", response_model=ProcessingRequestOut, tags=["processing_requests"], status_code=201)
@@ -119,12 +140,36 @@ async def create_processing_request(
         raise UserNotFoundHTTP()
     except ProjectNotFound:
         raise ProjectNotFoundHTTP()
-    except AssetNotFound as e:
-        raise AssetNotFoundHTTP(f"Asset not found: {e.asset_id}")
+    except InvalidInputAssets as e:
+        raise HTTPException(status_code=404 if e.not_found_ids else 400, detail=str(e))
+    except NotEnoughPermissions:
+        raise NotEnoughPermissionsHTTP()
+
+
+@router.post("/batch", response_model=list[ProcessingRequestOut], tags=["processing_requests"], status_code=201)
+async def create_processing_requests(
+    batch_data: ProcessingRequestsBatchIn,
+    processing_request_service: ProcessingRequestService = Depends(get_processing_request_service),
+    user: User = Depends(current_user),
+) -> Any:
+    """
+    Create several processing requests for the authenticated user at once. If any of them is invalid,
+    none is created.
+    """
+    try:
+        return await processing_request_service.create_processing_requests(
+            processing_requests=batch_data.processing_requests,
+            user_id=user.id,
+            current_user=user.__dict__,
+        )
+    except UserNotFound:
+        raise UserNotFoundHTTP()
+    except ProjectNotFound:
+        raise ProjectNotFoundHTTP()
+    except InvalidInputAssets as e:
+        raise HTTPException(status_code=404 if e.not_found_ids else 400, detail=str(e))
     except NotEnoughPermissions:
         raise NotEnoughPermissionsHTTP()
-    except QueueNotAvailable:
-        raise HTTPException(status_code=503, detail="Service Unavailable")
 
 
 @router.get("/{processing_request_id}", response_model=ProcessingRequestOut, tags=["processing_requests"])
@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
+from enum import Enum
 from typing import AsyncGenerator, Optional
 
-from kafka import KafkaProducer
+from aiokafka import AIOKafkaProducer
 
 from api_server.processing_requests.model import ProcessingRequestType
 from api_server.settings import settings
@@ -10,70 +12,128 @@ from api_server.settings import settings
 logger = logging.getLogger()
 
 
-class KafkaProducerService:
+class KafkaPartitioner(str, Enum):
     """
-    Service for sending messages to Kafka topics.
+    How processing request messages are assigned to partitions of a topic.
     """
 
-    # Number of partitions is the maximum amount of consumers that can read from a topic in parallel.
-    # If num_partitions=10, then from 1 up to 10 consumers can read from the topic in parallel.
-    _num_partitions = 10
+    PROCESSING_REQUEST_ID = "processing_request_id"  # keyed by processing request, spreads messages evenly
+    PROJECT_ID = "project_id"  # keyed by project, messages of a project keep their order in the same partition
+    ROUND_ROBIN = "round_robin"  # cycles through the partitions of the topic
+
+
+class KafkaProducerService:
+    """
+    Service for sending messages to Kafka topics. A single instance is shared by all requests for the lifetime
+    of the app (see kafka_producer_service), so messages of concurrent requests are batched by the same producer.
+    """
 
     def __init__(self):
-        # We use lazy initialization of the producer, because the KafkaProducerService is created for each request,
-        # where the ProcessingRequestServiceClient is used. During initialization of the ProcessingRequestServiceClient,
-        # KafkaProducer establishes a connection to Kafka, which is not necessary if we don't send any messages.
-        self._producer: Optional[KafkaProducer] = None
+        self._producer: Optional[AIOKafkaProducer] = None
+        # created on first use, because before Python 3.10 asyncio.Lock binds to the event loop when it's created
+        self._producer_lock: Optional[asyncio.Lock] = None
 
-        # This dictionary doesn't require us additionally handle concurrency, because built-in types are safe:
-        # https://docs.python.org/3/glossary.html#term-global-interpreter-lock
+        # Number of partitions is the maximum amount of consumers that can read from a topic in parallel,
+        # so messages are spread over all the partitions the topic has, according to the topic's metadata.
+        self._partitioner = KafkaPartitioner(settings.kafka_partitioner)
         self._topics = {
-            ProcessingRequestType.SIMULATION_PROSIMOS: {
-                "topic": settings.kafka_topic_simulation_prosimos,
-                "current_partition": 0,  # TODO: this doesn't work, it's always 0
-            },
-            ProcessingRequestType.SIMULATION_MODEL_OPTIMIZATION_SIMOD: {
-                "topic": settings.kafka_topic_process_model_optimization_simod,
-                "current_partition": 0,
-            },
-            ProcessingRequestType.SIMULATION_MODEL_OPTIMIZATION_OPTIMOS: {
-                "topic": settings.kafka_topic_process_model_optimization_optimos,
-                "current_partition": 0,
-            },
-            ProcessingRequestType.WAITING_TIME_ANALYSIS_KRONOS: {
-                "topic": settings.kafka_topic_waiting_time_analysis_kronos,
-                "current_partition": 0,
-            },
+            ProcessingRequestType.SIMULATION_PROSIMOS: settings.kafka_topic_simulation_prosimos,
+            ProcessingRequestType.SIMULATION_MODEL_OPTIMIZATION_SIMOD: (
+                settings.kafka_topic_process_model_optimization_simod
+            ),
+            ProcessingRequestType.SIMULATION_MODEL_OPTIMIZATION_OPTIMOS: (
+                settings.kafka_topic_process_model_optimization_optimos
+            ),
+            ProcessingRequestType.WAITING_TIME_ANALYSIS_KRONOS: settings.kafka_topic_waiting_time_analysis_kronos,
         }
+        # round robin counters by topic
+        self._next_partition: dict[str, int] = {}
+
+    async def start(self):
+        """
+        Connects the producer to Kafka. It's called on the app startup, and again on the next message
+        if Kafka wasn't available then.
+        """
+        await self._get_producer()
+
+    async def stop(self):
+        """
+        Delivers the pending messages and disconnects the producer.
+        """
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
+
+    async def send_message(self, processing_request_type: ProcessingRequestType, payload: dict):
+        """
+        Send a message to a Kafka topic depending on the processing request type, and wait until it's delivered.
+        """
+        await self.send_messages([(processing_request_type, payload)])
 
-    def _init_producer(self):
-        if self._producer is None:
-            self._producer = KafkaProducer(
-                bootstrap_servers=settings.kafka_bootstrap_servers,
-                value_serializer=lambda x: json.dumps(x).encode("utf-8"),
-                client_id="processing-requests",
-            )
+    async def send_messages(self, messages: list[tuple[ProcessingRequestType, dict]]):
+        """
+        Send several messages to Kafka topics depending on the processing request types, and wait until all
+        of them are delivered. The producer batches messages for linger_ms instead of flushing each of them.
+        """
+        deliveries = []
+        for processing_request_type, payload in messages:
+            deliveries.append(await self.enqueue_message(processing_request_type, payload))
+        await asyncio.gather(*deliveries)
 
-    def send_message(self, processing_request_type: ProcessingRequestType, payload: dict):
+    async def enqueue_message(self, processing_request_type: ProcessingRequestType, payload: dict) -> asyncio.Future:
         """
-        Send a message to a Kafka topic depending on the processing request type.
+        Adds a message to the producer's batch without waiting for the delivery. Returns a future that's resolved
+        when the message is delivered. Raises KafkaError if Kafka is not available, and other exceptions
+        if the message itself can't be sent, e.g., its type has no topic or its payload can't be serialized.
         """
-        topic, partition = self._get_topic_and_partition(processing_request_type)
-        self._send_message(topic, payload, partition)
+        producer = await self._get_producer()
+        topic = self._topics[processing_request_type]
+        key, partition = await self._get_key_and_partition(producer, topic, payload)
+        logger.info(f"Sending a message to Kafka: topic={topic}, key={key}, partition={partition}, payload={payload}")
+        return await producer.send(topic, payload, key=key, partition=partition)
+
+    async def _get_producer(self) -> AIOKafkaProducer:
+        if self._producer_lock is None:
+            self._producer_lock = asyncio.Lock()
+        async with self._producer_lock:
+            if self._producer is None:
+                producer = AIOKafkaProducer(
+                    bootstrap_servers=settings.kafka_bootstrap_servers,
+                    value_serializer=lambda x: json.dumps(x).encode("utf-8"),
+                    client_id="processing-requests",
+                    linger_ms=settings.kafka_producer_linger_ms,
+                    compression_type=settings.kafka_producer_compression_type,
+                    request_timeout_ms=settings.kafka_producer_request_timeout_ms,
+                )
+                try:
+                    await producer.start()
+                except Exception:
+                    await producer.stop()
+                    raise
+                self._producer = producer
+        return self._producer
+
+    async def _get_key_and_partition(
+        self, producer: AIOKafkaProducer, topic: str, payload: dict
+    ) -> tuple[Optional[bytes], Optional[int]]:
+        """
+        Returns either the key of the message, which the producer hashes to pick a partition,
+        or the partition to send the message to.
+        """
+        if self._partitioner == KafkaPartitioner.PROCESSING_REQUEST_ID:
+            return payload["processing_request_id"].encode(), None
+        if self._partitioner == KafkaPartitioner.PROJECT_ID:
+            return payload["project_id"].encode(), None
+
+        # the partitions are fetched from the topic's metadata once and then cached by the producer
+        partitions = sorted(await producer.partitions_for(topic))
+        current_partition = self._next_partition.get(topic, 0)
+        self._next_partition[topic] = current_partition + 1
+        return None, partitions[current_partition % len(partitions)]
 
-    def _send_message(self, topic: str, payload: dict, partition: int = 0):
-        self._init_producer()
-        self._producer.send(topic, payload, partition=partition)
-        logger.info(f"Sending a message to Kafka: topic={topic}, partition={partition}, payload={payload}")
-        self._producer.flush()
 
-    def _get_topic_and_partition(self, processing_request_type: ProcessingRequestType) -> tuple[str, int]:
-        topic = self._topics[processing_request_type]["topic"]
-        current_partition = self._topics[processing_request_type]["current_partition"]
-        partition = current_partition % self._num_partitions
-        self._topics[processing_request_type]["current_partition"] += 1
-        return topic, partition
+kafka_producer_service = KafkaProducerService()
 
 
 async def get_kafka_service() -> AsyncGenerator[KafkaProducerService, None]:
-    yield KafkaProducerService()
+    yield kafka_producer_service
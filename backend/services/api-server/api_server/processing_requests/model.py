@@ -3,8 +3,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, String, Uuid
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, Uuid
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -38,6 +38,10 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 class ProcessingRequest(Base):
     __tablename__ = "processing_request"
+    __table_args__ = (
+        Index("ix_processing_request_input_assets_ids", "input_assets_ids", postgresql_using="gin"),
+        Index("ix_processing_request_output_assets_ids", "output_assets_ids", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
 
@@ -58,8 +62,34 @@ class ProcessingRequest(Base):
 
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False, index=True)
     project_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False, index=True)
-    # NOTE: we don't index _ids columns because of a pretty low limit on the default btree index size.
-    #       If you still need indexing, consider this SQLAlchemy documentation page,
-    #       https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#index-types
+    # NOTE: _ids columns have GIN indexes (see __table_args__) because btree indexes have a pretty low size limit
+    #       and don't support containment. Filter these columns with .contains([id]) to use the indexes.
     input_assets_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
     output_assets_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
+
+
+class ProcessingRequestOutboxMessage(Base):
+    """
+    Kafka message of a processing request. It's written in the same transaction as the processing request
+    and published by the outbox relay (see outbox.py), so a processing request is never committed without its message.
+    Sent messages are kept for a while as an audit trail.
+    """
+
+    __tablename__ = "processing_request_outbox"
+
+    # the autoincrement id keeps the order in which messages are published
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    creation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    # set when the message can't be published at all, it's kept for inspection and never retried
+    dead_letter_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    processing_request_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("processing_request.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    type: Mapped[ProcessingRequestType] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    # failed publishing attempts
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from aiokafka.errors import KafkaError
+from opentelemetry import metrics
+
+from api_server.processing_requests.kafka_producer import kafka_producer_service
+from api_server.processing_requests.repository import ProcessingRequestRepository
+from api_server.settings import settings
+from api_server.utils.persistence.sqlalchemy import async_session_maker
+
+logger = logging.getLogger()
+
+meter = metrics.get_meter(__name__)
+published_messages_counter = meter.create_counter(
+    name="outbox_messages_published",
+    description="Number of processing request messages published from the outbox to Kafka",
+    unit="1",
+)
+failed_messages_counter = meter.create_counter(
+    name="outbox_messages_failed",
+    description="Number of failed attempts to publish processing request messages from the outbox to Kafka",
+    unit="1",
+)
+dead_lettered_messages_counter = meter.create_counter(
+    name="outbox_messages_dead_lettered",
+    description="Number of processing request messages in the outbox that can't be published and won't be retried",
+    unit="1",
+)
+
+
+async def publish_outbox_messages() -> int:
+    """
+    Publishes all unsent outbox messages to Kafka, in batches, and returns how many were published.
+    A batch is marked as sent only after Kafka acknowledges all of its messages.
+
+    If Kafka is not available, the whole batch is retried later. A message that can't be published by itself,
+    e.g., because its type or payload is invalid, would be retried forever and block the messages after it,
+    so it's dead-lettered instead and the rest of the batch is published.
+    """
+    total = 0
+    while True:
+        async with async_session_maker() as session:
+            repository = ProcessingRequestRepository(session)
+            messages = await repository.get_unsent_outbox_messages(limit=settings.outbox_relay_batch_size)
+            if len(messages) == 0:
+                return total
+
+            messages_ids = []
+            dead_letters = {}
+            try:
+                deliveries = []
+                for message in messages:
+                    try:
+                        deliveries.append(await kafka_producer_service.enqueue_message(message.type, message.payload))
+                        messages_ids.append(message.id)
+                    except KafkaError:
+                        raise
+                    except Exception as e:
+                        logger.exception(f"Outbox message {message.id} can't be published and is dead-lettered: {e}")
+                        dead_letters[message.id] = f"{type(e).__name__}: {e}"
+                await asyncio.gather(*deliveries)
+            except KafkaError as e:
+                await repository.mark_outbox_messages_failed([message.id for message in messages], str(e))
+                failed_messages_counter.add(len(messages))
+                raise
+            await repository.mark_outbox_messages_sent(messages_ids, dead_letters)
+            dead_lettered_messages_counter.add(len(dead_letters))
+
+        published_messages_counter.add(len(messages_ids))
+        total += len(messages_ids)
+        if len(messages) < settings.outbox_relay_batch_size:
+            return total
+
+
+async def delete_sent_outbox_messages() -> int:
+    async with async_session_maker() as session:
+        repository = ProcessingRequestRepository(session)
+        return await repository.delete_sent_outbox_messages(
+            sent_before=datetime.utcnow() - timedelta(hours=settings.outbox_retention_hours)
+        )
+
+
+class OutboxRelay:
+    """
+    Publishes processing request messages from the outbox to Kafka. The relay is woken up right after processing
+    requests are committed and, otherwise, polls the outbox periodically. Several API server processes can run it
+    at the same time, because messages being published by one of them are skipped by the others.
+    """
+
+    def __init__(self):
+        # created when the relay starts, because before Python 3.10 asyncio.Event binds to the current event loop
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """
+        Wakes up the relay to publish new messages without waiting for the next poll.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """
+        Publishes messages until cancelled. When Kafka is not available, publishing is retried with exponential
+        backoff, and the messages stay in the outbox in the meantime.
+        """
+        self._wakeup = asyncio.Event()
+        failures = 0
+        while True:
+            self._wakeup.clear()
+            try:
+                await publish_outbox_messages()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(
+                    settings.outbox_relay_interval_seconds * 2 ** (failures - 1),
+                    settings.outbox_relay_max_retry_delay_seconds,
+                )
+                logger.exception(f"Failed to publish outbox messages, retrying in {delay} seconds: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.outbox_relay_interval_seconds)
+            except asyncio.TimeoutError:
+                await self._delete_sent_messages()
+
+    @staticmethod
+    async def _delete_sent_messages() -> None:
+        try:
+            deleted = await delete_sent_outbox_messages()
+            if deleted > 0:
+                logger.info(f"Deleted {deleted} sent outbox messages")
+        except Exception as e:
+            logger.exception(f"Failed to delete sent outbox messages: {e}")
+
+
+outbox_relay = OutboxRelay()
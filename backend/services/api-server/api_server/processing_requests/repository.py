@@ -3,10 +3,17 @@ from typing import AsyncGenerator, Optional, Sequence
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import or_, select
+from sqlalchemy import ColumnElement, all_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
-from api_server.processing_requests.model import ProcessingRequest, ProcessingRequestStatus
+from api_server.processing_requests.model import (
+    ProcessingRequest,
+    ProcessingRequestOutboxMessage,
+    ProcessingRequestStatus,
+    ProcessingRequestType,
+)
+from api_server.utils.persistence.pagination import Page, paginate
 from api_server.utils.persistence.sqlalchemy import get_async_session
 
 
@@ -22,51 +29,88 @@ class ProcessingRequestRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_processing_requests(self) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(select(ProcessingRequest))
-        return result.scalars().all()
+    async def get_processing_requests(
+        self,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(page=page, status=status, type=type)
 
-    async def get_processing_requests_by_user_id(self, user_id: UUID) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(
-            select(ProcessingRequest).where(
-                ProcessingRequest.user_id == user_id,
-            )
+    async def get_processing_requests_by_user_id(
+        self,
+        user_id: UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(
+            ProcessingRequest.user_id == user_id, page=page, status=status, type=type
         )
-        return result.scalars().all()
 
-    async def get_processing_requests_by_project_id(self, project_id: UUID) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(
-            select(ProcessingRequest).where(
-                ProcessingRequest.project_id == project_id,
-            )
+    async def get_processing_requests_by_project_id(
+        self,
+        project_id: UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(
+            ProcessingRequest.project_id == project_id, page=page, status=status, type=type
         )
-        return result.scalars().all()
 
-    async def get_processing_requests_by_asset_id(self, asset_id: UUID) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(
-            select(ProcessingRequest).where(
-                or_(
-                    ProcessingRequest.input_assets_ids.contains([asset_id]),
-                    ProcessingRequest.output_assets_ids.contains([asset_id]),
-                )
-            )
+    async def get_processing_requests_by_asset_id(
+        self,
+        asset_id: UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(
+            or_(
+                ProcessingRequest.input_assets_ids.contains([asset_id]),
+                ProcessingRequest.output_assets_ids.contains([asset_id]),
+            ),
+            page=page,
+            status=status,
+            type=type,
         )
-        return result.scalars().all()
 
-    async def get_processing_requests_by_input_asset_id(self, asset_id: UUID) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(
-            select(ProcessingRequest).where(
-                ProcessingRequest.input_assets_ids.contains([asset_id]),
-            )
+    async def get_processing_requests_by_input_asset_id(
+        self,
+        asset_id: UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(
+            ProcessingRequest.input_assets_ids.contains([asset_id]), page=page, status=status, type=type
         )
-        return result.scalars().all()
 
-    async def get_processing_requests_by_output_asset_id(self, asset_id: UUID) -> Sequence[ProcessingRequest]:
-        result = await self.session.execute(
-            select(ProcessingRequest).where(
-                ProcessingRequest.output_assets_ids.contains([asset_id]),
-            )
+    async def get_processing_requests_by_output_asset_id(
+        self,
+        asset_id: UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._get_processing_requests(
+            ProcessingRequest.output_assets_ids.contains([asset_id]), page=page, status=status, type=type
         )
+
+    async def _get_processing_requests(
+        self,
+        *criteria: ColumnElement[bool],
+        page: Optional[Page],
+        status: Optional[ProcessingRequestStatus],
+        type: Optional[ProcessingRequestType],
+    ) -> Sequence[ProcessingRequest]:
+        statement = select(ProcessingRequest).where(*criteria)
+        if status is not None:
+            statement = statement.where(ProcessingRequest.status == status)
+        if type is not None:
+            statement = statement.where(ProcessingRequest.type == type)
+        result = await self.session.execute(paginate(statement, ProcessingRequest, page))
         return result.scalars().all()
 
     async def create_processing_request(
@@ -87,14 +131,120 @@ class ProcessingRequestRepository:
             should_notify=should_notify,
         )
         self.session.add(processing_request)
+        await self.session.flush()
+        self.session.add(self._outbox_message(processing_request))
         await self.session.commit()
         return processing_request
 
-    async def get_processing_request(self, processing_request_id: UUID) -> ProcessingRequest:
+    async def create_processing_requests(
+        self, user_id: UUID, processing_requests: list[dict]
+    ) -> list[ProcessingRequest]:
+        """
+        Creates the processing requests in a single transaction. The session flushes them as a multi-row INSERT.
+        """
+        created = [
+            ProcessingRequest(
+                type=values["type"],
+                status=ProcessingRequestStatus.CREATED,
+                user_id=user_id,
+                project_id=values["project_id"],
+                input_assets_ids=values["input_assets_ids"],
+                output_assets_ids=[],
+                should_notify=values["should_notify"],
+            )
+            for values in processing_requests
+        ]
+        self.session.add_all(created)
+        await self.session.flush()
+        self.session.add_all([self._outbox_message(processing_request) for processing_request in created])
+        await self.session.commit()
+        return created
+
+    @staticmethod
+    def _outbox_message(processing_request: ProcessingRequest) -> ProcessingRequestOutboxMessage:
+        return ProcessingRequestOutboxMessage(
+            processing_request_id=processing_request.id,
+            type=processing_request.type,
+            payload={
+                "processing_request_id": str(processing_request.id),
+                "user_id": str(processing_request.user_id),
+                "project_id": str(processing_request.project_id),
+                "input_assets_ids": [str(aid) for aid in processing_request.input_assets_ids],
+                "output_assets_ids": [str(aid) for aid in processing_request.output_assets_ids],
+                "should_notify": processing_request.should_notify,
+            },
+        )
+
+    async def get_unsent_outbox_messages(self, limit: int) -> Sequence[ProcessingRequestOutboxMessage]:
+        """
+        Returns the oldest unsent messages and locks them until the transaction ends. Messages locked by
+        another transaction are skipped, so several relays don't publish the same messages.
+        """
         result = await self.session.execute(
-            select(ProcessingRequest).where(ProcessingRequest.id == processing_request_id)
+            select(ProcessingRequestOutboxMessage)
+            .where(
+                ProcessingRequestOutboxMessage.sent_time.is_(None),
+                ProcessingRequestOutboxMessage.dead_letter_time.is_(None),
+            )
+            .order_by(ProcessingRequestOutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
         )
-        processing_request = result.scalar()
+        return result.scalars().all()
+
+    async def mark_outbox_messages_sent(
+        self, messages_ids: list[int], dead_letters: Optional[dict[int, str]] = None
+    ) -> None:
+        """
+        Marks messages as sent, and in the same transaction, messages that can't be published as dead letters,
+        with their errors keyed by message id.
+        """
+        await self.session.execute(
+            update(ProcessingRequestOutboxMessage)
+            .where(ProcessingRequestOutboxMessage.id.in_(messages_ids))
+            .values(sent_time=datetime.utcnow())
+        )
+        if dead_letters:
+            await self._dead_letter_outbox_messages(dead_letters)
+        await self.session.commit()
+
+    async def mark_outbox_messages_failed(self, messages_ids: list[int], error: str) -> None:
+        await self.session.execute(
+            update(ProcessingRequestOutboxMessage)
+            .where(ProcessingRequestOutboxMessage.id.in_(messages_ids))
+            .values(attempts=ProcessingRequestOutboxMessage.attempts + 1, last_error=error)
+        )
+        await self.session.commit()
+
+    async def _dead_letter_outbox_messages(self, errors: dict[int, str]) -> None:
+        """
+        Dead letters aren't retried, so their processing requests are failed, they would never be processed otherwise.
+        """
+        now = datetime.utcnow()
+        for message_id, error in errors.items():
+            message = await self.session.get(ProcessingRequestOutboxMessage, message_id)
+            message.dead_letter_time = now
+            message.attempts += 1
+            message.last_error = error
+            await self.session.execute(
+                update(ProcessingRequest)
+                .where(ProcessingRequest.id == message.processing_request_id)
+                .values(
+                    status=ProcessingRequestStatus.FAILED,
+                    message="The processing request couldn't be sent to the workers",
+                    end_time=now,
+                )
+            )
+
+    async def delete_sent_outbox_messages(self, sent_before: datetime) -> int:
+        result = await self.session.execute(
+            delete(ProcessingRequestOutboxMessage).where(ProcessingRequestOutboxMessage.sent_time < sent_before)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def get_processing_request(self, processing_request_id: UUID) -> ProcessingRequest:
+        processing_request = await self.session.get(ProcessingRequest, processing_request_id)
         if processing_request is None:
             raise ProcessingRequestNotFound()
         return processing_request
@@ -126,31 +276,47 @@ class ProcessingRequestRepository:
     async def add_input_asset_to_processing_request(
         self, processing_request_id: UUID, asset_id: UUID
     ) -> ProcessingRequest:
-        processing_request = await self.get_processing_request(processing_request_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        input_assets_ids = processing_request.input_assets_ids + [asset_id]
-        processing_request.input_assets_ids = list(set(input_assets_ids))
-
-        processing_request.modification_time = datetime.utcnow()
+        processing_request = await self._add_to_array(
+            processing_request_id, ProcessingRequest.input_assets_ids, asset_id
+        )
         await self.session.commit()
         return processing_request
 
     async def add_output_asset_to_processing_request(
         self, processing_request_id: UUID, asset_id: UUID
     ) -> ProcessingRequest:
-        processing_request = await self.get_processing_request(processing_request_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        output_assets_ids = processing_request.output_assets_ids + [asset_id]
-        processing_request.output_assets_ids = list(set(output_assets_ids))
-
-        processing_request.modification_time = datetime.utcnow()
+        processing_request = await self._add_to_array(
+            processing_request_id, ProcessingRequest.output_assets_ids, asset_id
+        )
         await self.session.commit()
         return processing_request
 
+    async def _add_to_array(
+        self, processing_request_id: UUID, column: InstrumentedAttribute, item: UUID
+    ) -> ProcessingRequest:
+        """
+        Appends the item to an array column unless it's already there. It's a single statement instead of
+        read-modify-write, so concurrent updates of the same processing request aren't lost.
+        """
+        result = await self.session.execute(
+            update(ProcessingRequest)
+            .where(ProcessingRequest.id == processing_request_id, all_(column) != item)
+            .values({column: func.array_append(column, item)})
+            .returning(ProcessingRequest)
+        )
+        processing_request = result.scalar()
+        if processing_request is None:
+            # either the processing request doesn't exist or it already has the item
+            result = await self.session.execute(
+                select(ProcessingRequest)
+                .where(ProcessingRequest.id == processing_request_id)
+                .execution_options(populate_existing=True)
+            )
+            processing_request = result.scalar()
+            if processing_request is None:
+                raise ProcessingRequestNotFound()
+        return processing_request
+
 
 async def get_processing_request_repository(
     session: AsyncSession = Depends(get_async_session),
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from api_server.assets.schemas import AssetOut
 from api_server.processing_requests.model import ProcessingRequestStatus, ProcessingRequestType
@@ -15,6 +15,10 @@ class ProcessingRequestIn(BaseModel):
     should_notify: bool = False
 
 
+class ProcessingRequestsBatchIn(BaseModel):
+    processing_requests: list[ProcessingRequestIn] = Field(min_length=1, max_length=1000)
+
+
 class ProcessingRequestOut(BaseModel):
     id: uuid.UUID
     creation_time: datetime
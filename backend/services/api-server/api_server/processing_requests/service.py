@@ -5,14 +5,17 @@ from typing import AsyncGenerator, Optional, Sequence, Union
 
 from fastapi import Depends
 from fastapi_users.exceptions import UserNotExists
-from kafka.errors import KafkaTimeoutError
 
 from api_server.assets.service import AssetService, get_asset_service
-from api_server.processing_requests.kafka_producer import KafkaProducerService, get_kafka_service
 from api_server.processing_requests.model import ProcessingRequest, ProcessingRequestStatus, ProcessingRequestType
+from api_server.processing_requests.outbox import outbox_relay
 from api_server.processing_requests.repository import ProcessingRequestRepository, get_processing_request_repository
+from api_server.processing_requests.schemas import ProcessingRequestIn
+from api_server.projects.model import Project
+from api_server.projects.repository import ProjectNotFound as ProjectRepositoryNotFound
 from api_server.projects.service import ProjectService, get_project_service
 from api_server.users.users import UserManager, get_user_manager
+from api_server.utils.persistence.pagination import Page
 
 logger = logging.getLogger()
 
@@ -40,6 +43,22 @@ class AssetDoesNotBelongToProject(Exception):
         self.asset_id = asset_id
 
 
+class InvalidInputAssets(Exception):
+    """
+    Input assets of a processing request that don't exist, are deleted, or belong to another project.
+    """
+
+    def __init__(self, not_found_ids: list[uuid.UUID], not_in_project_ids: list[uuid.UUID]) -> None:
+        messages = []
+        if not_found_ids:
+            messages.append(f"Assets not found: {', '.join(str(aid) for aid in not_found_ids)}")
+        if not_in_project_ids:
+            messages.append(f"Assets do not belong to the project: {', '.join(str(aid) for aid in not_in_project_ids)}")
+        super().__init__(". ".join(messages))
+        self.not_found_ids = not_found_ids
+        self.not_in_project_ids = not_in_project_ids
+
+
 class AssetAlreadyExists(Exception):
     pass
 
@@ -68,10 +87,6 @@ class NotEnoughPermissions(Exception):
     pass
 
 
-class QueueNotAvailable(Exception):
-    pass
-
-
 class ProcessingRequestService:
     def __init__(
         self,
@@ -79,35 +94,75 @@ class ProcessingRequestService:
         asset_service: AssetService,
         user_service: UserManager,
         project_service: ProjectService,
-        kafka_service: KafkaProducerService,
     ) -> None:
         self._processing_request_repository = processing_request_repository
         self._asset_service = asset_service
         self._user_service = user_service
         self._project_service = project_service
-        self._kafka_service = kafka_service
 
-    async def get_processing_requests(self) -> Sequence[ProcessingRequest]:
-        return await self._processing_request_repository.get_processing_requests()
+    async def get_processing_requests(
+        self,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._processing_request_repository.get_processing_requests(page, status, type)
 
-    async def get_processing_requests_by_user_id(self, user_id: uuid.UUID) -> Sequence[ProcessingRequest]:
-        return await self._processing_request_repository.get_processing_requests_by_user_id(user_id)
+    async def get_processing_requests_by_user_id(
+        self,
+        user_id: uuid.UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._processing_request_repository.get_processing_requests_by_user_id(user_id, page, status, type)
 
     async def get_processing_requests_by_project_id(
-        self, project_id: uuid.UUID, current_user: dict
+        self,
+        project_id: uuid.UUID,
+        current_user: dict,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
     ) -> Sequence[ProcessingRequest]:
         if not await self.does_user_have_access_to_project(current_user, project_id):
             raise NotEnoughPermissions()
-        return await self._processing_request_repository.get_processing_requests_by_project_id(project_id)
+        return await self._processing_request_repository.get_processing_requests_by_project_id(
+            project_id, page, status, type
+        )
 
-    async def get_processing_requests_by_asset_id(self, asset_id: uuid.UUID) -> Sequence[ProcessingRequest]:
-        return await self._processing_request_repository.get_processing_requests_by_asset_id(asset_id)
+    async def get_processing_requests_by_asset_id(
+        self,
+        asset_id: uuid.UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._processing_request_repository.get_processing_requests_by_asset_id(
+            asset_id, page, status, type
+        )
 
-    async def get_processing_requests_by_input_asset_id(self, asset_id: uuid.UUID) -> Sequence[ProcessingRequest]:
-        return await self._processing_request_repository.get_processing_requests_by_input_asset_id(asset_id)
+    async def get_processing_requests_by_input_asset_id(
+        self,
+        asset_id: uuid.UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._processing_request_repository.get_processing_requests_by_input_asset_id(
+            asset_id, page, status, type
+        )
 
-    async def get_processing_requests_by_output_asset_id(self, asset_id: uuid.UUID) -> Sequence[ProcessingRequest]:
-        return await self._processing_request_repository.get_processing_requests_by_output_asset_id(asset_id)
+    async def get_processing_requests_by_output_asset_id(
+        self,
+        asset_id: uuid.UUID,
+        page: Optional[Page] = None,
+        status: Optional[ProcessingRequestStatus] = None,
+        type: Optional[ProcessingRequestType] = None,
+    ) -> Sequence[ProcessingRequest]:
+        return await self._processing_request_repository.get_processing_requests_by_output_asset_id(
+            asset_id, page, status, type
+        )
 
     async def does_user_have_access_to_project(self, user: dict, project_id: uuid.UUID) -> bool:
         if user["is_superuser"]:
@@ -128,19 +183,8 @@ class ProcessingRequestService:
         except UserNotExists:
             raise UserNotFound()
 
-        project = await self._project_service.get_project(project_id)
-        if not project:
-            raise ProjectNotFound()
-
-        for asset_id in input_assets_ids:
-            ok = await self._asset_service.does_asset_exist(asset_id)
-            if not ok:
-                raise AssetNotFound(asset_id=asset_id)
-
-        if not await self.does_user_have_access_to_project(current_user, project_id):
-            raise NotEnoughPermissions()
-
-        await self._raise_for_assets_not_in_project(project_id, input_assets_ids)
+        project = await self._get_project_with_access(project_id, current_user)
+        await self._raise_for_invalid_input_assets([(project, input_assets_ids)])
 
         processing_request = await self._processing_request_repository.create_processing_request(
             type,
@@ -150,33 +194,48 @@ class ProcessingRequestService:
             should_notify,
         )
 
+        outbox_relay.notify()
+        return processing_request
+
+    async def create_processing_requests(
+        self,
+        processing_requests: list[ProcessingRequestIn],
+        user_id: uuid.UUID,
+        current_user: dict,
+    ) -> Sequence[ProcessingRequest]:
+        """
+        Creates several processing requests at once. They are validated together and inserted in a single transaction
+        with their outbox messages. If any of them is invalid, none is created.
+        """
+        try:
+            _ = await self._user_service.get(user_id)
+        except UserNotExists:
+            raise UserNotFound()
+
+        projects = {}
+        for project_id in dict.fromkeys(pr.project_id for pr in processing_requests):
+            projects[project_id] = await self._get_project_with_access(project_id, current_user)
+        await self._raise_for_invalid_input_assets(
+            [(projects[pr.project_id], pr.input_assets_ids) for pr in processing_requests]
+        )
+
+        created = await self._processing_request_repository.create_processing_requests(
+            user_id, [pr.model_dump() for pr in processing_requests]
+        )
+
+        outbox_relay.notify()
+        return created
+
+    async def _get_project_with_access(self, project_id: uuid.UUID, current_user: dict) -> Project:
         try:
-            self._kafka_service.send_message(
-                type,
-                {
-                    "processing_request_id": str(processing_request.id),
-                    "user_id": str(user_id),
-                    "project_id": str(project_id),
-                    "input_assets_ids": [str(aid) for aid in input_assets_ids],
-                    "output_assets_ids": [],
-                    "should_notify": should_notify,
-                },
-            )
-        except KafkaTimeoutError as e:
-            logger.error(
-                f"Failed to send a message to Kafka. "
-                f"Details: "
-                f"type={type}, "
-                f"user_id={user_id}, "
-                f"project_id={project_id}, "
-                f"input_assets_ids={input_assets_ids}, "
-                f"output_assets_ids={[]}, "
-                f"should_notify={should_notify}, "
-                f"error: {e}"
-            )
-            raise QueueNotAvailable()
+            project = await self._project_service.get_project(project_id)
+        except ProjectRepositoryNotFound:
+            raise ProjectNotFound()
 
-        return processing_request
+        if not await self.does_user_have_access_to_project(current_user, project_id):
+            raise NotEnoughPermissions()
+
+        return project
 
     async def get_processing_request(self, processing_request_id: uuid.UUID) -> ProcessingRequest:
         return await self._processing_request_repository.get_processing_request(processing_request_id)
@@ -251,15 +310,25 @@ class ProcessingRequestService:
         project_assets_ids = [str(pid) for pid in project.assets_ids]
         return str(asset_id) in project_assets_ids
 
-    async def _raise_for_assets_not_in_project(self, project_id: uuid.UUID, assets_ids: list[uuid.UUID]) -> None:
+    async def _raise_for_invalid_input_assets(self, input_assets: list[tuple[Project, list[uuid.UUID]]]) -> None:
         """
-        Check if all assets belong to the project.
+        Checks that the input assets of one or more processing requests exist and belong to the processing
+        request's project. The assets are fetched in a single query, and all the offending ones are reported at once.
         """
-        project = await self._project_service.get_project(project_id)
-        project_assets_ids = [str(pid) for pid in project.assets_ids]
-        for asset_id in assets_ids:
-            if str(asset_id) not in project_assets_ids:
-                raise AssetDoesNotBelongToProject(asset_id=asset_id)
+        all_assets_ids = list(dict.fromkeys(asset_id for _, assets_ids in input_assets for asset_id in assets_ids))
+        assets = {asset.id: asset for asset in await self._asset_service.get_assets_by_ids(all_assets_ids)}
+        not_found_ids = []
+        not_in_project_ids = []
+        for project, assets_ids in input_assets:
+            project_assets_ids = set(project.assets_ids)
+            for asset_id in assets_ids:
+                asset = assets.get(asset_id)
+                if asset is None or asset.deletion_time is not None:
+                    not_found_ids.append(asset_id)
+                elif asset_id not in project_assets_ids:
+                    not_in_project_ids.append(asset_id)
+        if not_found_ids or not_in_project_ids:
+            raise InvalidInputAssets(list(dict.fromkeys(not_found_ids)), list(dict.fromkeys(not_in_project_ids)))
 
 
 async def get_processing_request_service(
@@ -267,8 +336,5 @@ async def get_processing_request_service(
     asset_service: AssetService = Depends(get_asset_service),
     user_service: UserManager = Depends(get_user_manager),
     project_service: ProjectService = Depends(get_project_service),
-    kafka_service: KafkaProducerService = Depends(get_kafka_service),
 ) -> AsyncGenerator[ProcessingRequestService, None]:
-    yield ProcessingRequestService(
-        processing_request_repository, asset_service, user_service, project_service, kafka_service
-    )
+    yield ProcessingRequestService(processing_request_repository, asset_service, user_service, project_service)
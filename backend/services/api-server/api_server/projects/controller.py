@@ -1,7 +1,7 @@
 import uuid
 from typing import Annotated, Any, Optional, Sequence
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Response
 
 from api_server.projects.model import Project
 from api_server.projects.repository import ProjectNotFound
@@ -28,6 +28,7 @@ from api_server.utils.exceptions.http_exceptions import (
     ProjectNotFoundHTTP,
     UserNotFoundHTTP,
 )
+from api_server.utils.persistence.pagination import Page, get_page, set_next_cursor, with_default_limit
 
 router = APIRouter()
 
@@ -44,15 +45,22 @@ def _get_token(authorization: Annotated[str, Header()]) -> str:
 
 @router.get("/", response_model=list[ProjectOut], tags=["projects"])
 async def get_projects(
+    response: Response,
     user_id: Optional[uuid.UUID] = None,
+    page: Page = Depends(get_page),
     project_service: ProjectService = Depends(get_project_service),
     user=Depends(current_active_user),  # raises 401 if user is not authenticated
 ) -> Sequence[Project]:
     if user_id:
-        return await project_service.get_projects_by_user_id(user_id)
-    if not user.is_superuser:
-        return await project_service.get_projects_by_user_id(user.id)
-    return await project_service.get_projects()
+        projects = await project_service.get_projects_by_user_id(user_id, page)
+    elif not user.is_superuser:
+        projects = await project_service.get_projects_by_user_id(user.id, page)
+    else:
+        page = with_default_limit(page)
+        projects = await project_service.get_projects(page)
+
+    set_next_cursor(response, projects, page)
+    return projects
 
 
 @router.post("/", response_model=ProjectOut, status_code=201, tags=["projects"])
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Uuid
+from sqlalchemy import DateTime, ForeignKey, Index, Uuid
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
@@ -14,6 +14,10 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 class Project(Base):
     __tablename__ = "project"
+    __table_args__ = (
+        Index("ix_project_users_ids", "users_ids", postgresql_using="gin"),
+        Index("ix_project_assets_ids", "assets_ids", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
 
@@ -31,9 +35,20 @@ class Project(Base):
     # Implicit relationships to other microservices' tables
 
     # must have at least one user
-    # NOTE: we don't index _ids columns because of a pretty low limit on the default btree index size.
-    #       If you still need indexing, consider this SQLAlchemy documentation page,
-    #       https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#index-types
+    # NOTE: _ids columns have GIN indexes (see __table_args__) because btree indexes have a pretty low size limit
+    #       and don't support containment. Filter these columns with .contains([id]) to use the indexes.
     users_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
     assets_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
     processing_requests_ids: Mapped[list[uuid.UUID]] = mapped_column(ARRAY(Uuid), nullable=False, default=[])
+
+
+class ProjectUser(Base):
+    """
+    User with access to the project. The table mirrors Project.users_ids, so access checks are a primary key lookup
+    instead of loading the whole array.
+    """
+
+    __tablename__ = "project_user"
+
+    project_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("project.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, index=True)
@@ -4,12 +4,15 @@ from typing import AsyncGenerator, Optional, Sequence
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import select, update
+from sqlalchemy import ColumnElement, all_, any_, delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
+from api_server.utils.persistence.pagination import Page, paginate
 from api_server.utils.persistence.sqlalchemy import get_async_session
 
-from .model import Project
+from .model import Project, ProjectUser
 
 
 class ProjectNotFound(Exception):
@@ -24,12 +27,17 @@ class ProjectRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_projects(self) -> Sequence[Project]:
-        result = await self.session.execute(select(Project))
+    async def get_projects(self, page: Optional[Page] = None) -> Sequence[Project]:
+        result = await self.session.execute(paginate(select(Project), Project, page))
         return result.scalars().all()
 
-    async def get_projects_by_user_id(self, user_id: UUID) -> Sequence[Project]:
-        result = await self.session.execute(select(Project).where(Project.users_ids.contains([user_id])))
+    async def get_projects_by_user_id(self, user_id: UUID, page: Optional[Page] = None) -> Sequence[Project]:
+        statement = (
+            select(Project)
+            .join(ProjectUser, ProjectUser.project_id == Project.id)
+            .where(ProjectUser.user_id == user_id)
+        )
+        result = await self.session.execute(paginate(statement, Project, page))
         return result.scalars().all()
 
     async def create_project(
@@ -48,12 +56,13 @@ class ProjectRepository:
             description=description,
         )
         self.session.add(project)
+        await self.session.flush()
+        await self._add_users(project.id, users_ids)
         await self.session.commit()
         return project
 
     async def get_project(self, project_id: uuid.UUID) -> Project:
-        result = await self.session.execute(select(Project).where(Project.id == project_id))
-        project = result.scalar()
+        project = await self.session.get(Project, project_id)
         if project is None:
             raise ProjectNotFound()
         return project
@@ -74,80 +83,103 @@ class ProjectRepository:
         return project
 
     async def add_user_to_project(self, project_id: uuid.UUID, user_id: uuid.UUID) -> Project:
-        project = await self.get_project(project_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        users_ids = project.users_ids + [user_id]
-        project.users_ids = list(set(users_ids))
-
-        project.modification_time = datetime.utcnow()
+        project = await self._add_to_array(project_id, Project.users_ids, user_id)
+        await self._add_users(project_id, [user_id])
         await self.session.commit()
         return project
 
     async def remove_user_from_project(self, project_id: uuid.UUID, user_id: uuid.UUID) -> Project:
-        project = await self.get_project(project_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        project.users_ids = self._remove_item_from_list(project.users_ids, user_id)
-
-        project.modification_time = datetime.utcnow()
+        project = await self._remove_from_array(project_id, Project.users_ids, user_id)
+        await self.session.execute(
+            delete(ProjectUser).where(ProjectUser.project_id == project_id, ProjectUser.user_id == user_id)
+        )
         await self.session.commit()
         return project
 
     async def add_asset_to_project(self, project_id: uuid.UUID, asset_id: uuid.UUID) -> Project:
-        project = await self.get_project(project_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        assets_ids = project.assets_ids + [asset_id]
-        project.assets_ids = list(set(assets_ids))
-
-        project.modification_time = datetime.utcnow()
+        project = await self._add_to_array(project_id, Project.assets_ids, asset_id)
         await self.session.commit()
         return project
 
     async def remove_asset_from_project(self, project_id: uuid.UUID, asset_id: uuid.UUID) -> Project:
-        project = await self.get_project(project_id)
-
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        assets_ids = self._remove_item_from_list(project.assets_ids, asset_id)
-        project.assets_ids = assets_ids
-
-        project.modification_time = datetime.utcnow()
+        project = await self._remove_from_array(project_id, Project.assets_ids, asset_id)
         await self.session.commit()
         return project
 
     async def add_processing_request_to_project(
         self, project_id: uuid.UUID, processing_request_id: uuid.UUID
     ) -> Project:
-        project = await self.get_project(project_id)
+        project = await self._add_to_array(project_id, Project.processing_requests_ids, processing_request_id)
+        await self.session.commit()
+        return project
 
-        # NOTE: don't use "append" on arrays because it doesn't trigger SQLAlchemy to update the database
-        #   https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#sqlalchemy.dialects.postgresql.ARRAY
-        processing_requests_ids = project.processing_requests_ids + [processing_request_id]
-        project.processing_requests_ids = list(set(processing_requests_ids))
+    async def _add_to_array(self, project_id: uuid.UUID, column: InstrumentedAttribute, item: uuid.UUID) -> Project:
+        """
+        Appends the item to an array column unless it's already there. It's a single statement instead of
+        read-modify-write, so concurrent updates of the same project aren't lost.
+        """
+        return await self._update_array(
+            project_id,
+            column,
+            value=func.array_append(column, item),
+            condition=all_(column) != item,
+        )
 
-        project.modification_time = datetime.utcnow()
-        await self.session.commit()
+    async def _remove_from_array(
+        self, project_id: uuid.UUID, column: InstrumentedAttribute, item: uuid.UUID
+    ) -> Project:
+        return await self._update_array(
+            project_id,
+            column,
+            value=func.array_remove(column, item),
+            condition=any_(column) == item,
+        )
+
+    async def _update_array(
+        self,
+        project_id: uuid.UUID,
+        column: InstrumentedAttribute,
+        value: ColumnElement,
+        condition: ColumnElement[bool],
+    ) -> Project:
+        result = await self.session.execute(
+            update(Project)
+            .where(Project.id == project_id, condition)
+            .values({column: value, Project.modification_time: datetime.utcnow()})
+            .returning(Project)
+        )
+        project = result.scalar()
+        if project is None:
+            # either the project doesn't exist or the array doesn't need to change
+            result = await self.session.execute(
+                select(Project).where(Project.id == project_id).execution_options(populate_existing=True)
+            )
+            project = result.scalar()
+            if project is None:
+                raise ProjectNotFound()
         return project
 
+    async def has_user(self, project_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        result = await self.session.execute(
+            select(exists().where(ProjectUser.project_id == project_id, ProjectUser.user_id == user_id))
+        )
+        return result.scalar()
+
+    async def _add_users(self, project_id: uuid.UUID, users_ids: list[uuid.UUID]) -> None:
+        if len(users_ids) == 0:
+            return
+        await self.session.execute(
+            insert(ProjectUser)
+            .values([{"project_id": project_id, "user_id": user_id} for user_id in users_ids])
+            .on_conflict_do_nothing()
+        )
+
     async def delete_project(self, project_id: uuid.UUID) -> None:
         await self.session.execute(
             update(Project).where(Project.id == project_id).values(deletion_time=datetime.utcnow())
         )
         await self.session.commit()
 
-    @staticmethod
-    def _remove_item_from_list(items: list, item: any) -> list:
-        result = []
-        for i in items:
-            if i != item:
-                result.append(i)
-        return result
-
 
 async def get_project_repository(
     session: AsyncSession = Depends(get_async_session),
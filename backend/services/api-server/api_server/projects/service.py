@@ -11,6 +11,7 @@ from api_server.assets.service import AssetService, get_asset_service
 from api_server.projects.model import Project
 from api_server.projects.repository import ProjectRepository, get_project_repository
 from api_server.users.users import UserManager, get_user_manager
+from api_server.utils.persistence.pagination import Page
 
 logger = logging.getLogger()  # noqa: F821
 
@@ -47,11 +48,11 @@ class ProjectService:
         self._asset_service = asset_service
         self._user_manager = user_manager
 
-    async def get_projects(self) -> Sequence[Project]:
-        return await self._project_repository.get_projects()
+    async def get_projects(self, page: Optional[Page] = None) -> Sequence[Project]:
+        return await self._project_repository.get_projects(page)
 
-    async def get_projects_by_user_id(self, user_id: uuid.UUID) -> Sequence[Project]:
-        return await self._project_repository.get_projects_by_user_id(user_id)
+    async def get_projects_by_user_id(self, user_id: uuid.UUID, page: Optional[Page] = None) -> Sequence[Project]:
+        return await self._project_repository.get_projects_by_user_id(user_id, page)
 
     async def create_project(
         self,
@@ -156,10 +157,7 @@ class ProjectService:
         await self._project_repository.delete_project(project_id)
 
     async def does_user_have_access_to_project(self, user_id: uuid.UUID, project_id: uuid.UUID) -> bool:
-        project = await self.get_project(project_id)
-        current_user_id = str(user_id)
-        project_user_id = [str(user_id) for user_id in project.users_ids]
-        return current_user_id in project_user_id
+        return await self._project_repository.has_user(project_id, user_id)
 
 
 async def get_project_service(
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 from pydantic import HttpUrl, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -24,10 +25,30 @@ class Settings(BaseSettings):
     kafka_topic_process_model_optimization_simod: str
     kafka_topic_process_model_optimization_optimos: str
     kafka_topic_waiting_time_analysis_kronos: str
+    kafka_producer_linger_ms: int = 5  # how long the producer waits to batch messages of concurrent requests
+    kafka_producer_compression_type: Optional[str] = "gzip"  # gzip or None, lz4, snappy and zstd need extras
+    kafka_producer_request_timeout_ms: int = 10000
+    kafka_partitioner: str = "processing_request_id"  # processing_request_id, project_id or round_robin
+    outbox_relay_interval_seconds: float = 5
+    outbox_relay_max_retry_delay_seconds: float = 60
+    outbox_relay_batch_size: int = 100
+    outbox_retention_hours: int = 168
 
     # files
     base_dir: Path = Path('/var/tmp/uploads/')
     blobs_base_public_url: HttpUrl
+    upload_session_expiration_hours: int = 24
+    blob_codec: str = "none"  # compression of blobs at rest: none, gzip or zstd
+    blob_store: str = "filesystem"  # where blobs are kept: filesystem (in base_dir) or s3
+    s3_bucket: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None  # reachable by the API server and workers, e.g., http://minio:9000
+    s3_public_endpoint_url: Optional[str] = None  # reachable by browsers, defaults to s3_endpoint_url
+    s3_region: Optional[str] = None
+    s3_access_key_id_file: Optional[Path] = None
+    s3_secret_access_key_file: Optional[Path] = None
+    s3_presigned_url_expiration_seconds: int = 3600
+    blob_sweeper_interval_seconds: int = 300
+    blob_sweeper_batch_size: int = 100
 
     # assets
     blobs_base_internal_url: HttpUrl
@@ -8,6 +8,7 @@ from starlette.requests import Request
 from starlette.types import ASGIApp
 
 from api_server.users.db import User
+from api_server.utils.persistence.sqlalchemy import count_queries
 
 logger = logging.getLogger()
 
@@ -22,6 +23,11 @@ requests_duration_histogram = meter.create_histogram(
     description="The distribution of the duration of requests",
     unit="s",
 )
+db_queries_histogram = meter.create_histogram(
+    name="requests_db_queries",
+    description="The distribution of the number of database queries per request",
+    unit="1",
+)
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
@@ -34,6 +40,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
         start = time.time()
+        queries = count_queries()
         response = await call_next(request)
         end = time.time()
 
@@ -51,7 +58,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             f"status_code={response.status_code} "
             f"request_bytes={request.headers.get('content-length')} "
             f"response_bytes={response.headers.get('content-length')} "
-            f"duration={end-start}"
+            f"duration={end-start} "
+            f"db_queries={queries.count}"
         )
 
         requests_counter.add(
@@ -76,6 +84,15 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             },
         )
 
+        db_queries_histogram.record(
+            queries.count,
+            {
+                "path": request.url.path,
+                "method": request.method,
+                "status_code": response.status_code,
+            },
+        )
+
         return response
 
 
@@ -0,0 +1,105 @@
+import base64
+import binascii
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+
+max_page_size = 1000
+# limit of whole-table listings when the client doesn't give one
+default_page_size = 100
+
+next_cursor_header = "X-Next-Cursor"
+
+
+@dataclass
+class Page:
+    """
+    Keyset pagination over (creation_time, id) in ascending order, with an optional creation time range.
+    Without a limit, all matching rows are returned, except in whole-table listings, see with_default_limit.
+    """
+
+    limit: Optional[int] = None
+    after: Optional[tuple[datetime, uuid.UUID]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+def get_page(
+    limit: Optional[int] = Query(None, ge=1, le=max_page_size),
+    cursor: Optional[str] = None,  # value of the X-Next-Cursor header of the previous page
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Page:
+    return Page(
+        limit=limit,
+        after=_decode_cursor(cursor) if cursor is not None else None,
+        created_after=_to_naive_utc(created_after),
+        created_before=_to_naive_utc(created_before),
+    )
+
+
+def with_default_limit(page: Page) -> Page:
+    """
+    Returns the page limited to default_page_size rows if it has no limit. Listings scoped to a project or a user
+    stay complete by default, because the web UI doesn't paginate them, but listings of whole tables don't.
+    """
+    if page.limit is not None:
+        return page
+    return replace(page, limit=default_page_size)
+
+
+def paginate(statement: Select, model: type, page: Optional[Page]) -> Select:
+    """
+    Applies the page to a statement selecting the model, which must have creation_time and id columns.
+    """
+    if page is None:
+        return statement
+
+    if page.created_after is not None:
+        statement = statement.where(model.creation_time >= page.created_after)
+    if page.created_before is not None:
+        statement = statement.where(model.creation_time < page.created_before)
+    if page.after is not None:
+        # NOTE: unlike OFFSET, which reads and discards all the previous rows, the scan starts right after
+        #   the cursor. The redundant condition on creation_time lets Postgres use the creation_time index.
+        creation_time, id = page.after
+        statement = statement.where(
+            model.creation_time >= creation_time,
+            tuple_(model.creation_time, model.id) > tuple_(creation_time, id),
+        )
+    if page.limit is not None or page.after is not None:
+        statement = statement.order_by(model.creation_time, model.id).limit(page.limit)
+    return statement
+
+
+def set_next_cursor(response: Response, items: Sequence, page: Page) -> None:
+    """
+    Sets the X-Next-Cursor header if the page is full, so there may be more items.
+    """
+    if page.limit is None or len(items) < page.limit:
+        return
+    last = items[-1]
+    response.headers[next_cursor_header] = _encode_cursor(last.creation_time, last.id)
+
+
+def _encode_cursor(creation_time: datetime, id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{creation_time.isoformat()}|{id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        creation_time, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(creation_time), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # timestamps are stored as naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,5 +1,7 @@
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -15,5 +17,39 @@ async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI caches dependencies per request, so all repositories of a request share this session. Its identity map
+    works as a request-scoped cache: repositories load entities by primary key with session.get(), which doesn't
+    query the database again for an entity that was already loaded in the same request.
+    """
     async with async_session_maker() as session:
         yield session
+
+
+class QueryCounter:
+    """
+    Number of statements executed against the database, see count_queries.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+def count_queries() -> QueryCounter:
+    """
+    Starts counting the statements executed in the current context, e.g., by a request,
+    including the tasks started from it.
+    """
+    counter = QueryCounter()
+    _query_counter.set(counter)
+    return counter
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_query(*_) -> None:
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
@@ -0,0 +1,97 @@
+"""
+Measures the memory of a running API server while a large file is uploaded with POST /files/. The body is
+generated on the fly and streamed, and the resident set size (RSS) of the server process is read from /proc,
+so the script must run on the same Linux host as the server.
+
+Usage, from backend/services/api-server after poetry install, with the server running, e.g., with run.dev.sh:
+
+    poetry run python scripts/benchmark_upload_memory.py --pid <server pid> --email <email> --password <password>
+"""
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+_chunk_size = 1024 * 1024
+
+
+def read_memory_kb(pid: int) -> dict[str, int]:
+    """
+    Returns the current (VmRSS) and peak (VmHWM) resident set size of the process in KiB.
+    """
+    memory = {}
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            memory[key] = int(value.split()[0])
+    return memory
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.05) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_kb = 0
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            self.peak_rss_kb = max(self.peak_rss_kb, read_memory_kb(self.pid)["VmRSS"])
+            time.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.join()
+
+
+def generate_body(size: int):
+    # random content, so the upload isn't deduplicated with a previous run
+    remaining = size
+    while remaining > 0:
+        chunk = os.urandom(min(_chunk_size, remaining))
+        remaining -= len(chunk)
+        yield chunk
+
+
+def main(args: argparse.Namespace) -> None:
+    size = args.size_mb * 1024 * 1024
+    with httpx.Client(base_url=args.url, timeout=None) as client:
+        response = client.post("/auth/jwt/login", data={"username": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        before = read_memory_kb(args.pid)
+        sampler = MemorySampler(args.pid)
+        sampler.start()
+        start = time.perf_counter()
+        response = client.post(
+            "/files/",
+            params={"name": "benchmark.csv", "type": "event_log_csv"},
+            headers={**headers, "Content-Type": "application/octet-stream"},
+            content=generate_body(size),
+        )
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        response.raise_for_status()
+        after = read_memory_kb(args.pid)
+
+        client.delete(f"/files/{response.json()['id']}", headers=headers).raise_for_status()
+
+    print(f"uploaded {args.size_mb} MiB in {elapsed:.2f} s")
+    print(f"server RSS before: {before['VmRSS'] / 1024:.0f} MiB, after: {after['VmRSS'] / 1024:.0f} MiB")
+    print(f"server peak RSS during the upload: {sampler.peak_rss_kb / 1024:.0f} MiB")
+    print(f"server peak RSS since it started: {after['VmHWM'] / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pid", type=int, required=True, help="process id of the API server")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--size-mb", type=int, default=512)
+    main(parser.parse_args())
@@ -0,0 +1,16 @@
+"""
+The tests run against the PostgreSQL database in DATABASE_URL, migrated to the latest revision, e.g., with
+`alembic upgrade head` or by starting the API server once. Without DATABASE_URL, they're skipped.
+"""
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+@pytest.fixture
+def session_maker() -> async_sessionmaker:
+    # every test runs its own event loop, so connections can't be pooled between tests
+    engine = create_async_engine(os.environ["DATABASE_URL"], poolclass=NullPool)
+    return async_sessionmaker(engine, expire_on_commit=False)
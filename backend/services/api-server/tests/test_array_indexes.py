@@ -0,0 +1,51 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+if "DATABASE_URL" not in os.environ:
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import ClauseElement, Executable, Select, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import InstrumentedAttribute  # noqa: E402
+
+from api_server.assets.model import Asset  # noqa: E402
+from api_server.processing_requests.model import ProcessingRequest  # noqa: E402
+from api_server.projects.model import Project  # noqa: E402
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return "EXPLAIN " + compiler.process(element.statement, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "column, index",
+    [
+        (Asset.files_ids, "ix_asset_files_ids"),
+        (Project.assets_ids, "ix_project_assets_ids"),
+        (ProcessingRequest.input_assets_ids, "ix_processing_request_input_assets_ids"),
+    ],
+    ids=["asset.files_ids", "project.assets_ids", "processing_request.input_assets_ids"],
+)
+def test_contains_filter_uses_gin_index(session_maker: async_sessionmaker, column: InstrumentedAttribute, index: str):
+    async def run() -> str:
+        async with session_maker() as session:
+            # small test tables are cheaper to scan, so the planner has to be told to use an index when it can
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+            statement = select(column.class_.id).where(column.contains([uuid.uuid4()]))
+            result = await session.execute(Explain(statement))
+            return "\n".join(result.scalars())
+
+    plan = asyncio.run(run())
+    assert f"Bitmap Index Scan on {index}" in plan
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+if "DATABASE_URL" not in os.environ:
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import delete  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from api_server.processing_requests.model import (  # noqa: E402
+    ProcessingRequest,
+    ProcessingRequestStatus,
+    ProcessingRequestType,
+)
+from api_server.processing_requests.repository import ProcessingRequestRepository  # noqa: E402
+from api_server.projects.model import Project  # noqa: E402
+from api_server.projects.repository import ProjectRepository  # noqa: E402
+
+concurrent_updates = 20
+
+
+def test_concurrent_add_asset_to_project_keeps_all_assets(session_maker: async_sessionmaker):
+    async def add_asset(project_id: uuid.UUID, asset_id: uuid.UUID) -> None:
+        # a session per call, like concurrent requests
+        async with session_maker() as session:
+            await ProjectRepository(session).add_asset_to_project(project_id, asset_id)
+
+    async def run() -> None:
+        async with session_maker() as session:
+            project = await ProjectRepository(session).create_project(name="test", users_ids=[uuid.uuid4()])
+        try:
+            assets_ids = [uuid.uuid4() for _ in range(concurrent_updates)]
+            await asyncio.gather(*(add_asset(project.id, asset_id) for asset_id in assets_ids))
+
+            async with session_maker() as session:
+                project = await session.get(Project, project.id)
+            assert sorted(project.assets_ids) == sorted(assets_ids)
+        finally:
+            async with session_maker() as session:
+                await session.execute(delete(Project).where(Project.id == project.id))
+                await session.commit()
+
+    asyncio.run(run())
+
+
+def test_concurrent_add_output_asset_to_processing_request_keeps_all_assets(session_maker: async_sessionmaker):
+    async def add_output_asset(processing_request_id: uuid.UUID, asset_id: uuid.UUID) -> None:
+        async with session_maker() as session:
+            await ProcessingRequestRepository(session).add_output_asset_to_processing_request(
+                processing_request_id, asset_id
+            )
+
+    async def run() -> None:
+        async with session_maker() as session:
+            processing_request = ProcessingRequest(
+                type=ProcessingRequestType.SIMULATION_PROSIMOS,
+                status=ProcessingRequestStatus.RUNNING,
+                user_id=uuid.uuid4(),
+                project_id=uuid.uuid4(),
+                input_assets_ids=[],
+                output_assets_ids=[],
+            )
+            session.add(processing_request)
+            await session.commit()
+        try:
+            assets_ids = [uuid.uuid4() for _ in range(concurrent_updates)]
+            await asyncio.gather(*(add_output_asset(processing_request.id, asset_id) for asset_id in assets_ids))
+
+            async with session_maker() as session:
+                processing_request = await session.get(ProcessingRequest, processing_request.id)
+            assert sorted(processing_request.output_assets_ids) == sorted(assets_ids)
+        finally:
+            async with session_maker() as session:
+                await session.execute(delete(ProcessingRequest).where(ProcessingRequest.id == processing_request.id))
+                await session.commit()
+
+    asyncio.run(run())
@@ -19,6 +19,8 @@ class Settings(BaseSettings):
     file_service_url: HttpUrl
     processing_request_service_url: HttpUrl
     project_service_url: HttpUrl
+    # Simod processing can be resource demanding, so by default several of them don't run concurrently
+    max_concurrent_jobs: int = 1
 
     model_config = SettingsConfigDict(env_file=Path(__file__).parent.parent / ".env", extra="allow")
 
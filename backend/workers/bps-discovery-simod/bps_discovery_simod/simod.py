@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import shutil
@@ -74,11 +75,13 @@ class SimodService:
                 start_time=datetime.utcnow(),
             )
 
-            # download assets
-            assets = [
-                await self._asset_service_client.download_asset(asset_id, self._assets_base_dir, is_internal=True)
-                for asset_id in processing_request.input_assets_ids
-            ]
+            # download assets, each request has its own directory because requests are processed concurrently
+            assets_dir = self._assets_base_dir / processing_request.processing_request_id
+            assets_dir.mkdir(parents=True, exist_ok=True)
+            dirs_to_delete.append(assets_dir)
+            assets = await self._asset_service_client.download_assets(
+                processing_request.input_assets_ids, assets_dir, is_internal=True
+            )
             for asset in assets:
                 if asset.files is not None:
                     files_to_delete.extend(asset.files)
@@ -86,8 +89,10 @@ class SimodService:
             # update Simod configuration to include the correct event log path, process model
             event_log_path, config_file_path = self.update_configuration(assets, processing_request)
 
-            # run Simod, it can take hours
-            results_dir, result_dir, result_stdout, result_stderr = self.run_simod(config_file_path, processing_request)
+            # run Simod in a subprocess, it can take hours
+            results_dir, result_dir, result_stdout, result_stderr = await self.run_simod(
+                config_file_path, processing_request
+            )
             dirs_to_delete.append(results_dir)
 
             # upload results and create corresponding assets
@@ -173,10 +178,10 @@ class SimodService:
         )
         return event_log_file.path, config_file_path
 
-    def run_simod(self, config_file_path: Path, processing_request: ProcessingRequest):
+    async def run_simod(self, config_file_path: Path, processing_request: ProcessingRequest):
         results_dir = self._simod_results_base_dir / processing_request.processing_request_id
         results_dir.mkdir(parents=True, exist_ok=True)
-        result = _start_simod_discovery_subprocess(config_file_path, results_dir)
+        result = await _start_simod_discovery_subprocess(config_file_path, results_dir)
         result_stdout = result.stdout if result.stdout is not None else ""
         result_stderr = result.stderr if result.stderr is not None else ""
         return results_dir, result.output_dir, result_stdout, result_stderr
@@ -316,13 +321,18 @@ class SimodDiscoveryResult:
     output_dir: Optional[Path] = None
 
 
-def _start_simod_discovery_subprocess(configuration_path: Path, output_dir: Path) -> SimodDiscoveryResult:
-    result = subprocess.run(
-        ["bash", "/usr/src/Simod/run.sh", str(configuration_path), str(output_dir)],
+async def _start_simod_discovery_subprocess(configuration_path: Path, output_dir: Path) -> SimodDiscoveryResult:
+    # NOTE: the subprocess is awaited asynchronously, so the consumer and other requests aren't blocked meanwhile
+    args = ["bash", "/usr/src/Simod/run.sh", str(configuration_path), str(output_dir)]
+    process = await asyncio.create_subprocess_exec(
+        *args,
         cwd="/usr/src/Simod/",
-        capture_output=True,
-        check=True,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
     )
+    stdout, stderr = await process.communicate()
+    result = subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+    result.check_returncode()
 
     result_dir = output_dir / "best_result"
     if not result_dir.exists():
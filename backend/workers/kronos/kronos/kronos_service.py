@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
+from pix_portal_lib.job_executor import JobExecutor
 from pix_portal_lib.kafka_clients.email_producer import EmailNotificationProducer, EmailNotificationRequest
 from pix_portal_lib.service_clients.asset import Asset, AssetServiceClient, AssetType, File_
 from pix_portal_lib.service_clients.file import FileType
@@ -49,6 +50,7 @@ class KronosService:
         self._project_service_client = ProjectServiceClient()
         self._user_service_client = UserServiceClient()
         self._kronos_http_client = KronosHTTPClient()
+        self._job_executor = JobExecutor(max_workers=settings.max_concurrent_jobs)
 
         self._assets_base_dir.mkdir(parents=True, exist_ok=True)
         self._kronos_results_base_dir.mkdir(parents=True, exist_ok=True)
@@ -68,11 +70,13 @@ class KronosService:
                 start_time=datetime.utcnow(),
             )
 
-            # download assets
-            assets = [
-                await self._asset_service_client.download_asset(asset_id, self._assets_base_dir, is_internal=True)
-                for asset_id in processing_request.input_assets_ids
-            ]
+            # download assets, each request has its own directory because requests are processed concurrently
+            assets_dir = self._assets_base_dir / processing_request.processing_request_id
+            assets_dir.mkdir(parents=True, exist_ok=True)
+            dirs_to_delete.append(assets_dir)
+            assets = await self._asset_service_client.download_assets(
+                processing_request.input_assets_ids, assets_dir, is_internal=True
+            )
             for asset in assets:
                 if asset.files is not None:
                     files_to_delete.extend(asset.files)
@@ -81,7 +85,7 @@ class KronosService:
             event_log_file, column_mapping_file = self._extract_input_files(assets)
             self._validate_input_files([event_log_file, column_mapping_file])
 
-            # run Kronos, it can take time
+            # run Kronos in a separate process, it can take time
             logger.info(
                 f"Running Kronos analysis: "
                 f"processing_request_id={processing_request.processing_request_id}, "
@@ -91,7 +95,8 @@ class KronosService:
             output_dir = self._kronos_results_base_dir / processing_request.processing_request_id
             dirs_to_delete.append(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
-            csv_output_path, json_output_path = self._run_kronos(
+            csv_output_path, json_output_path = await self._job_executor.run(
+                self._run_kronos,
                 event_log_path=event_log_file.path,
                 column_mapping_path=column_mapping_file.path,
                 output_dir=output_dir,
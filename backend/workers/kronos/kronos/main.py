@@ -1,60 +1,30 @@
-import asyncio
-import json
-import logging
-import uuid
-
 import pix_portal_lib.open_telemetry_utils as open_telemetry_utils
-from kafka import KafkaConsumer
+from pix_portal_lib.kafka_clients.consumer import KafkaConsumerRuntime
 from pix_portal_lib.service_clients.processing_request import ProcessingRequest
 
 from kronos.kronos_service import KronosService
 from kronos.settings import settings
 
-logger = logging.getLogger()
-
-open_telemetry_utils.instrument_worker(service_name="waiting_time_analysis_kronos", httpx=True)
-
-consumer_id = f"{settings.kafka_consumer_group_id}-{uuid.uuid4()}"
-# group_id should be the same for all parallel consumers that process the same topic
-group_id = settings.kafka_consumer_group_id
-
-consumer = KafkaConsumer(
-    settings.kafka_topic_requests,
-    client_id=consumer_id,
-    group_id=group_id,
-    bootstrap_servers=settings.kafka_bootstrap_servers,
-    auto_offset_reset="earliest",
-    value_deserializer=lambda x: json.loads(x.decode("utf-8")),
-)
-
-logger.info(
-    f"Kafka consumer connected: "
-    f"consumer_id={consumer_id}, "
-    f"group_id={group_id}, "
-    f"bootstrap_connected={consumer.bootstrap_connected()}"
-)
-
-kronos_service = KronosService()
 
+def main() -> None:
+    open_telemetry_utils.instrument_worker(service_name="waiting_time_analysis_kronos", httpx=True)
 
-async def process_message(message):
-    logger.info(f"Kafka consumer {consumer_id} received a message from Kafka: {message}")
-    request = ProcessingRequest(**message.value)
-    try:
-        await kronos_service.process(request)
-        logger.info(f"Kafka consumer {consumer_id} finished processing the message: {message}")
-    except Exception as e:
-        logger.exception(f"Kafka consumer {consumer_id} failed to process the message: {message}, error: {e}")
+    kronos_service = KronosService()
 
+    async def process_message(value: dict) -> None:
+        await kronos_service.process(ProcessingRequest(**value))
 
-async def main():
-    for message in consumer:
-        try:
-            if not asyncio.get_event_loop() or asyncio.get_event_loop().is_closed():
-                asyncio.set_event_loop(asyncio.new_event_loop())
-            await asyncio.create_task(process_message(message))
-        except Exception as e:
-            logger.exception(f"Kafka consumer {consumer_id} failed to process the message: {message}, error: {e}")
+    consumer = KafkaConsumerRuntime(
+        topic=settings.kafka_topic_requests,
+        group_id=settings.kafka_consumer_group_id,
+        bootstrap_servers=settings.kafka_bootstrap_servers,
+        handler=process_message,
+        max_concurrent_messages=settings.max_concurrent_jobs,
+    )
+    consumer.run_forever()
 
 
-asyncio.run(main())
+# NOTE: the worker starts only when the module is run as a script, because the processes
+#   that run the CPU-bound steps of the requests import this module as well
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ import os
 import time
 
 import yaml
+from pix_portal_lib.job_executor import JobExecutor
 from pix_portal_lib.kafka_clients.email_producer import EmailNotificationProducer, EmailNotificationRequest
 from pix_portal_lib.service_clients.asset import Asset, AssetServiceClient, AssetType, File_
 from pix_portal_lib.service_clients.file import FileType
@@ -51,6 +52,7 @@ class OptimosService:
         self._processing_request_service_client = ProcessingRequestServiceClient()
         self._project_service_client = ProjectServiceClient()
         self._user_service_client = UserServiceClient()
+        self._job_executor = JobExecutor(max_workers=settings.max_concurrent_jobs)
 
         self._assets_base_dir.mkdir(parents=True, exist_ok=True)
         self._optimos_results_base_dir.mkdir(parents=True, exist_ok=True)
@@ -76,11 +78,13 @@ class OptimosService:
                 start_time=datetime.utcnow(),
             )
 
-            # download assets
-            assets = [
-                await self._asset_service_client.download_asset(asset_id, self._assets_base_dir, is_internal=True)
-                for asset_id in processing_request.input_assets_ids
-            ]
+            # download assets, each request has its own directory because requests are processed concurrently
+            assets_dir = self._assets_base_dir / processing_request.processing_request_id
+            assets_dir.mkdir(parents=True, exist_ok=True)
+            dirs_to_delete.append(assets_dir)
+            assets = await self._asset_service_client.download_assets(
+                processing_request.input_assets_ids, assets_dir, is_internal=True
+            )
             for asset in assets:
                 if asset.files is not None:
                     files_to_delete.extend(asset.files)
@@ -195,8 +199,18 @@ class OptimosService:
             start_time=datetime.utcnow(),
         )
 
-        run_optimization(model_path, sim_param_path, constraints_path, num_instances, algorithm, approach,
-                                stats_file.name, log_name)
+        # run in a separate process, it can take hours
+        await self._job_executor.run(
+            run_optimization,
+            model_path,
+            sim_param_path,
+            constraints_path,
+            num_instances,
+            algorithm,
+            approach,
+            stats_file.name,
+            log_name,
+        )
 
         return Path(stats_file.name)
 
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from pydantic import HttpUrl
@@ -19,6 +20,8 @@ class Settings(BaseSettings):
     file_service_url: HttpUrl
     processing_request_service_url: HttpUrl
     project_service_url: HttpUrl
+    # number of requests processed in parallel, each one runs the CPU-bound step in a separate process
+    max_concurrent_jobs: int = os.cpu_count() or 1
 
     model_config = SettingsConfigDict(env_file=Path(__file__).parent.parent / ".env", extra="allow")
 
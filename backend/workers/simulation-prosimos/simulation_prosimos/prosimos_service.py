@@ -1,5 +1,6 @@
 import json
 import logging
+import shutil
 import traceback
 from collections import namedtuple
 from datetime import datetime, timezone
@@ -7,6 +8,7 @@ from pathlib import Path
 from typing import Optional
 from uuid import UUID
 
+from pix_portal_lib.job_executor import JobExecutor
 from pix_portal_lib.kafka_clients.email_producer import EmailNotificationProducer, EmailNotificationRequest
 from pix_portal_lib.service_clients.asset import Asset, AssetServiceClient, AssetType, File_
 from pix_portal_lib.service_clients.file import FileType
@@ -59,6 +61,7 @@ class ProsimosService:
         self._processing_request_service_client = ProcessingRequestServiceClient()
         self._project_service_client = ProjectServiceClient()
         self._user_service_client = UserServiceClient()
+        self._job_executor = JobExecutor(max_workers=settings.max_concurrent_jobs)
 
         self._assets_base_dir.mkdir(parents=True, exist_ok=True)
         self._prosimos_results_base_dir.mkdir(parents=True, exist_ok=True)
@@ -79,6 +82,7 @@ class ProsimosService:
         """
         files_to_delete = []
         file_paths_to_delete = []
+        dirs_to_delete = []
         try:
             # update processing request status
             await self._processing_request_service_client.update_request(
@@ -87,11 +91,13 @@ class ProsimosService:
                 start_time=datetime.utcnow(),
             )
 
-            # download assets
-            assets = [
-                await self._asset_service_client.download_asset(asset_id, self._assets_base_dir, is_internal=True)
-                for asset_id in processing_request.input_assets_ids
-            ]
+            # download assets, each request has its own directory because requests are processed concurrently
+            assets_dir = self._assets_base_dir / processing_request.processing_request_id
+            assets_dir.mkdir(parents=True, exist_ok=True)
+            dirs_to_delete.append(assets_dir)
+            assets = await self._asset_service_client.download_assets(
+                processing_request.input_assets_ids, assets_dir, is_internal=True
+            )
             for asset in assets:
                 if asset.files is not None:
                     files_to_delete.extend(asset.files)
@@ -105,16 +111,18 @@ class ProsimosService:
                 f"Running Prosimos simulation, "
                 f"processing_request_id={processing_request.processing_request_id}, "
                 f"bpmn_file={bpmn_file}, "
-                f"simulation_model_file={prosimos_json_file}"
+                f"simulation_model_file={prosimos_json_file}, "
+                f"configuration={config}"
             )
 
-            # run Prosimos, it can take time
+            # run Prosimos in a separate process, it can take time
             output_path = self._prosimos_results_base_dir / f"{processing_request.processing_request_id}.csv"
             statistics_path = (
                 self._prosimos_results_base_dir / f"{processing_request.processing_request_id}_statistics.csv"
             )
             file_paths_to_delete.extend([output_path, statistics_path])
-            self._run_prosimos(
+            await self._job_executor.run(
+                self._run_prosimos,
                 bpmn_path=bpmn_file.path,
                 simulation_model_path=prosimos_json_file.path,
                 statistics_path=statistics_path,
@@ -138,6 +146,7 @@ class ProsimosService:
                 asset_type=AssetType.EVENT_LOG,
                 project_id=processing_request.project_id,
                 users_ids=[UUID(processing_request.user_id)],
+                compress=settings.compress_event_logs,
             )
 
             # update project assets
@@ -192,6 +201,9 @@ class ProsimosService:
                 if file_path.exists():
                     logger.info(f"Deleting file: {file_path}")
                     file_path.unlink()
+            for dir in dirs_to_delete:
+                logger.info(f"Deleting directory: {dir}")
+                shutil.rmtree(dir, ignore_errors=True)
 
         # set token to None to force re-authentication, because the token might have expired
         self._asset_service_client.nullify_token()
@@ -231,8 +243,6 @@ class ProsimosService:
         output_path: Path,
         configuration: ProsimosConfiguration,
     ):
-        logger.info(f"Running Prosimos simulation with configuration: {configuration}")
-
         run_simulation(
             bpmn_path=bpmn_path,
             json_path=simulation_model_path,
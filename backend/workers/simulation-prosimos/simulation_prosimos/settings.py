@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from pydantic import HttpUrl
@@ -13,12 +14,15 @@ class Settings(BaseSettings):
     asset_service_url: HttpUrl
     asset_base_dir: Path
     prosimos_results_base_dir: Path
+    compress_event_logs: bool = False
     system_email_file: Path
     system_password_file: Path
     auth_service_url: HttpUrl
     file_service_url: HttpUrl
     processing_request_service_url: HttpUrl
     project_service_url: HttpUrl
+    # number of requests processed in parallel, each one runs the CPU-bound step in a separate process
+    max_concurrent_jobs: int = os.cpu_count() or 1
 
     model_config = SettingsConfigDict(env_file=Path(__file__).parent.parent / ".env", extra="allow")
 